@@ -1,13 +1,33 @@
-from analysis.db_connector import DatabaseConnector
-from analysis.data_loader import DataLoader
-from analysis.normalizador import Normalizador
-from analysis.analisador import Analisador
-from analysis.visualizador import Visualizador
-
-__all__ = [
-    'DatabaseConnector',
-    'DataLoader',
-    'Normalizador',
-    'Analisador',
-    'Visualizador'
-]
+import importlib
+from typing import TYPE_CHECKING
+
+# submodulos carregados no primeiro acesso: "from analysis import DataLoader" nao importa plotly/matplotlib
+_EXPORTS = {
+    'DatabaseConnector': 'analysis.db_connector',
+    'DataLoader': 'analysis.data_loader',
+    'Normalizador': 'analysis.normalizador',
+    'Analisador': 'analysis.analisador',
+    'EstatisticasIncrementais': 'analysis.analisador',
+    'Visualizador': 'analysis.visualizador',
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from analysis.db_connector import DatabaseConnector
+    from analysis.data_loader import DataLoader
+    from analysis.normalizador import Normalizador
+    from analysis.analisador import Analisador, EstatisticasIncrementais
+    from analysis.visualizador import Visualizador
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
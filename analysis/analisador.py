@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional, Sequence
 
 
 class Analisador:
@@ -98,6 +98,18 @@ class Analisador:
             columns={'index': 'uf', 'uf': 'total_projetos'}
         )
 
+    @staticmethod
+    def analise_incremental(
+        chunks: Iterable[pd.DataFrame],
+        colunas_contagem: Sequence[str] = ('situacao', 'uf'),
+        colunas_valor: Sequence[str] = ('qdt_empregos_gerados', 'populacao_beneficiada'),
+        tamanho_amostra: int = 10_000
+    ) -> 'EstatisticasIncrementais':
+        estatisticas = EstatisticasIncrementais(colunas_contagem, colunas_valor, tamanho_amostra)
+        for chunk in chunks:
+            estatisticas.atualizar(chunk)
+        return estatisticas
+
     @staticmethod
     def analise_completa(df: pd.DataFrame) -> Dict[str, Any]:
         return {
@@ -107,3 +119,112 @@ class Analisador:
             'empregos': Analisador.analise_empregos(df),
             'populacao': Analisador.analise_populacao(df)
         }
+
+
+class AcumuladorValores:
+    # media/desvio combinados por chunk (Chan et al.); mediana aproximada por amostragem de reservatorio
+    def __init__(self, tamanho_amostra: int, rng: np.random.Generator):
+        self.tamanho_amostra = tamanho_amostra
+        self.rng = rng
+        self.total = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.soma = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.amostra = np.empty(0)
+
+    def atualizar(self, valores: np.ndarray):
+        n = len(valores)
+        if n == 0:
+            return
+
+        media_chunk = valores.mean()
+        m2_chunk = ((valores - media_chunk) ** 2).sum()
+        delta = media_chunk - self.media
+        total = self.total + n
+
+        self.m2 += m2_chunk + delta ** 2 * self.total * n / total
+        self.media += delta * n / total
+        self.soma += valores.sum()
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+        self._amostrar(valores)
+        self.total = total
+
+    def _amostrar(self, valores: np.ndarray):
+        livres = self.tamanho_amostra - len(self.amostra)
+        if livres > 0:
+            self.amostra = np.concatenate([self.amostra, valores[:livres]])
+            valores = valores[livres:]
+            vistos = self.total + livres
+        else:
+            vistos = self.total
+
+        if len(valores) == 0:
+            return
+
+        # o i-esimo valor entra no reservatorio com probabilidade k/i
+        posicoes = self.rng.integers(0, vistos + np.arange(1, len(valores) + 1))
+        substitui = posicoes < self.tamanho_amostra
+        self.amostra[posicoes[substitui]] = valores[substitui]
+
+    def resultado(self) -> Dict[str, Any]:
+        if self.total == 0:
+            return {}
+
+        return {
+            'total': int(self.total),
+            'media': float(self.media),
+            'mediana': float(np.median(self.amostra)),
+            'minimo': float(self.minimo),
+            'maximo': float(self.maximo),
+            'desvio_padrao': float(np.sqrt(self.m2 / (self.total - 1))) if self.total > 1 else float('nan'),
+            'soma_total': float(self.soma)
+        }
+
+
+class EstatisticasIncrementais:
+    def __init__(
+        self,
+        colunas_contagem: Sequence[str] = ('situacao', 'uf'),
+        colunas_valor: Sequence[str] = ('qdt_empregos_gerados', 'populacao_beneficiada'),
+        tamanho_amostra: int = 10_000,
+        seed: Optional[int] = None
+    ):
+        rng = np.random.default_rng(seed)
+        self.total_registros = 0
+        self.nulos = pd.Series(dtype='int64')
+        self.contagens = {coluna: pd.Series(dtype='int64') for coluna in colunas_contagem}
+        self.valores = {coluna: AcumuladorValores(tamanho_amostra, rng) for coluna in colunas_valor}
+
+    def atualizar(self, df: pd.DataFrame):
+        self.total_registros += len(df)
+        self.nulos = self.nulos.add(df.isna().sum(), fill_value=0).astype('int64')
+
+        for coluna in self.contagens:
+            if coluna in df.columns:
+                contagem = df[coluna].value_counts(sort=False)
+                contagem.index = contagem.index.astype(object)
+                self.contagens[coluna] = self.contagens[coluna].add(contagem, fill_value=0).astype('int64')
+
+        for coluna, acumulador in self.valores.items():
+            if coluna in df.columns:
+                valores = pd.to_numeric(df[coluna], errors='coerce').dropna()
+                acumulador.atualizar(valores.to_numpy(dtype=float))
+
+    def contagem(self, coluna: str) -> pd.DataFrame:
+        contagem = self.contagens[coluna]
+        contagem = contagem[contagem > 0].sort_values(ascending=False)
+        return contagem.rename_axis(coluna).reset_index(name='total')
+
+    def analise_valores(self, coluna: str) -> Dict[str, Any]:
+        return self.valores[coluna].resultado()
+
+    def analise_completa(self) -> Dict[str, Any]:
+        return {
+            'total_registros': self.total_registros,
+            'nulos': {coluna: int(total) for coluna, total in self.nulos.items() if total > 0},
+            'contagens': {coluna: self.contagem(coluna).to_dict('records') for coluna in self.contagens},
+            'valores': {coluna: self.analise_valores(coluna) for coluna in self.valores}
+        }
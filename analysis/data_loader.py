@@ -1,21 +1,175 @@
+import io
+from functools import lru_cache
 import pandas as pd
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import select, Boolean, BigInteger, Integer, Float, Date, DateTime
+from sqlalchemy.dialects import postgresql
 from analysis.db_connector import DatabaseConnector
+from analysis.snapshot import SnapshotCache
+
+# sem os campos Text longos (descricao, endereco, observacoes...): suficiente para o dashboard
+COLUNAS_RESUMO = [
+    "id", "id_unico", "nome", "uf", "situacao", "especie", "natureza",
+    "data_inicial_prevista", "data_final_prevista", "data_inicial_efetiva", "data_final_efetiva",
+    "data_cadastro", "data_situacao", "qdt_empregos_gerados", "populacao_beneficiada",
+    "is_modelada_por_bim",
+]
+
+COLUNAS_CATEGORICAS = ["situacao", "uf", "especie", "natureza"]
+
+CHUNK_SIZE = 10_000
+
+BACKENDS = ("sql", "arrow")
+
+
+# api.models le o Settings (.env) ao ser importado: a tabela so e resolvida no primeiro uso
+@lru_cache(maxsize=None)
+def tabela_projetos():
+    from api.models import ProjetoInvestimento
+    return ProjetoInvestimento.__table__
+
+
+@lru_cache(maxsize=None)
+def colunas_projetos() -> List[str]:
+    return [coluna.name for coluna in tabela_projetos().columns if coluna.name != "content_hash"]
+
+
+LAZY_ATTRIBUTES = {
+    "TABELA_PROJETOS": tabela_projetos,
+    "COLUNAS_PROJETOS": colunas_projetos,
+}
+
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        return LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class DataLoader:
-    def __init__(self):
+    def __init__(self, snapshots: Optional[bool] = None):
+        from api.config import settings
+
+        if snapshots is None:
+            snapshots = settings.SNAPSHOT_ENABLED
         self.connector = DatabaseConnector()
         self.engine = self.connector.engine
+        self.snapshots = SnapshotCache(self.engine) if snapshots else None
+
+    def cached(self, nome: str, params, loader) -> pd.DataFrame:
+        if self.snapshots is None:
+            return loader()
+        return self.snapshots.get(nome, params, loader)
+
+    def generation(self) -> str:
+        # geracao atual dos dados (sync_state), barata: cacheada por SNAPSHOT_GENERATION_TTL_SECONDS
+        return (self.snapshots or SnapshotCache(self.engine)).generation()
 
     def load_table(self, table_name: str) -> pd.DataFrame:
-        return pd.read_sql(f"SELECT * FROM {table_name}", self.engine)
+        return self.cached("table", table_name, lambda: pd.read_sql(f"SELECT * FROM {table_name}", self.engine))
 
     def execute_query(self, query: str, params: Optional[dict] = None) -> pd.DataFrame:
+        # consultas livres nao passam pelo snapshot: podem ler dados que o sync nao versiona
         return pd.read_sql(query, self.engine, params=params)
 
-    def load_projetos(self) -> pd.DataFrame:
-        return self.load_table("projetos_investimento")
+    def _cached_query(self, query: str, params: Optional[dict] = None) -> pd.DataFrame:
+        # so para os agregados abaixo, que mudam apenas com o sync
+        return self.cached("query", [query, params], lambda: self.execute_query(query, params))
+
+    def iter_query(
+        self,
+        query,
+        params: Optional[dict] = None,
+        chunksize: int = CHUNK_SIZE,
+        **kwargs
+    ) -> Iterator[pd.DataFrame]:
+        # cursor no servidor: o Postgres entrega chunksize linhas por vez
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, max_row_buffer=chunksize)
+            for chunk in pd.read_sql(query, conn, params=params, chunksize=chunksize, **kwargs):
+                yield chunk
+
+    def load_projetos(
+        self,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        backend: str = "sql"
+    ) -> pd.DataFrame:
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend inválido: {backend}. Use um de {BACKENDS}")
+
+        query, parse_dates, dtype = self._projetos_query(columns, where)
+
+        def loader():
+            if backend == "arrow":
+                return self.read_arrow(query).to_pandas(types_mapper=arrow_types_mapper)
+            return pd.read_sql(query, self.engine, parse_dates=parse_dates, dtype=dtype)
+
+        return self.cached("projetos", [columns, where, backend], loader)
+
+    def read_arrow(self, query):
+        # valores vao literais no SQL: COPY nao aceita parametros
+        sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+        try:
+            import adbc_driver_postgresql.dbapi as adbc
+        except ImportError:
+            return self._read_copy(sql, query.selected_columns)
+
+        with adbc.connect(self.connector.url) as conn, conn.cursor() as cursor:
+            cursor.execute(sql)
+            # mesmos tipos do caminho COPY (date32 -> timestamp, int32 -> int64...): o resultado nao depende do driver
+            return cast_arrow(cursor.fetch_arrow_table(), query.selected_columns)
+
+    def _read_copy(self, sql: str, colunas):
+        buffer = io.BytesIO()
+        conn = self.engine.raw_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", buffer)
+        finally:
+            conn.close()
+
+        buffer.seek(0)
+        return read_copy_csv(buffer, colunas)
+
+    def iter_projetos(
+        self,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        chunksize: int = CHUNK_SIZE
+    ) -> Iterator[pd.DataFrame]:
+        query, parse_dates, dtype = self._projetos_query(columns, where)
+        return self.iter_query(query.order_by(tabela_projetos().c.id), chunksize=chunksize, parse_dates=parse_dates, dtype=dtype)
+
+    def _projetos_query(self, columns: Optional[List[str]], where: Optional[Dict[str, Any]]):
+        tabela, colunas = tabela_projetos(), colunas_projetos()
+        columns = columns or colunas
+        desconhecidas = set(columns) - set(colunas)
+        if desconhecidas:
+            raise ValueError(f"Colunas inválidas: {sorted(desconhecidas)}")
+
+        query = select(*[tabela.c[nome] for nome in columns])
+
+        # filtros vao para o WHERE do Postgres; lista/tupla/set vira IN
+        for nome, valor in (where or {}).items():
+            if nome not in colunas:
+                raise ValueError(f"Coluna inválida no filtro: {nome}")
+            coluna = tabela.c[nome]
+            if isinstance(valor, (list, tuple, set)):
+                query = query.where(coluna.in_(list(valor)))
+            elif valor is None:
+                query = query.where(coluna.is_(None))
+            else:
+                query = query.where(coluna == valor)
+
+        parse_dates = [
+            nome for nome in columns
+            if isinstance(tabela.c[nome].type, (Date, DateTime))
+        ]
+        dtype = {nome: "category" for nome in columns if nome in COLUNAS_CATEGORICAS}
+
+        return query, parse_dates, dtype
 
     def load_executores(self) -> pd.DataFrame:
         return self.load_table("executores")
@@ -31,70 +185,45 @@ class DataLoader:
 
     def load_top_executores(self, n: int = 10) -> pd.DataFrame:
         query = """
-        SELECT
-            e.nome,
-            e.codigo,
-            COUNT(*) as total_projetos
-        FROM executores e
-        JOIN projeto_executor pe ON e.id = pe.executor_id
-        GROUP BY e.id, e.nome, e.codigo
+        SELECT nome, codigo, total_projetos
+        FROM mv_top_executores
         ORDER BY total_projetos DESC
         LIMIT %(n)s
         """
-        return self.execute_query(query, params={'n': n})
+        return self._cached_query(query, params={'n': n})
 
     def load_top_tomadores(self, n: int = 10) -> pd.DataFrame:
         query = """
-        SELECT
-            t.nome,
-            t.codigo,
-            COUNT(*) as total_projetos
-        FROM tomadores t
-        JOIN projeto_tomador pt ON t.id = pt.tomador_id
-        GROUP BY t.id, t.nome, t.codigo
+        SELECT nome, codigo, total_projetos
+        FROM mv_top_tomadores
         ORDER BY total_projetos DESC
         LIMIT %(n)s
         """
-        return self.execute_query(query, params={'n': n})
+        return self._cached_query(query, params={'n': n})
 
     def load_valores_por_repassador(self) -> pd.DataFrame:
         query = """
-        SELECT
-            r.nome,
-            r.codigo,
-            COUNT(DISTINCT pr.projeto_id) as total_projetos,
-            SUM(fr.valor_investimento_previsto) as valor_total
-        FROM repassadores r
-        JOIN projeto_repassador pr ON r.id = pr.repassador_id
-        JOIN fontes_recurso fr ON pr.projeto_id = fr.projeto_id
-        GROUP BY r.id, r.nome, r.codigo
+        SELECT nome, codigo, total_projetos, valor_total
+        FROM mv_valores_por_repassador
         ORDER BY valor_total DESC
         """
-        return self.execute_query(query)
+        return self._cached_query(query)
 
     def load_distribuicao_situacao(self) -> pd.DataFrame:
         query = """
-        SELECT
-            situacao,
-            COUNT(*) as total
-        FROM projetos_investimento
-        WHERE situacao IS NOT NULL
-        GROUP BY situacao
+        SELECT situacao, total
+        FROM mv_distribuicao_situacao
         ORDER BY total DESC
         """
-        return self.execute_query(query)
+        return self._cached_query(query)
 
     def load_projetos_por_ano(self) -> pd.DataFrame:
         query = """
-        SELECT
-            EXTRACT(YEAR FROM data_cadastro) as ano,
-            COUNT(*) as total_projetos
-        FROM projetos_investimento
-        WHERE data_cadastro IS NOT NULL
-        GROUP BY ano
+        SELECT ano, total_projetos
+        FROM mv_projetos_por_ano
         ORDER BY ano
         """
-        return self.execute_query(query)
+        return self._cached_query(query)
 
     def load_projetos_completo(self) -> pd.DataFrame:
         query = """
@@ -112,4 +241,64 @@ class DataLoader:
         LEFT JOIN repassadores r ON pr.repassador_id = r.id
         GROUP BY p.id
         """
-        return self.execute_query(query)
+        return self._cached_query(query)
+
+
+def arrow_type(coluna):
+    import pyarrow as pa
+
+    if coluna.name in COLUNAS_CATEGORICAS:
+        return pa.dictionary(pa.int32(), pa.string())
+
+    tipos = [
+        (BigInteger, pa.int64()),
+        (Integer, pa.int64()),
+        (Float, pa.float64()),
+        (Boolean, pa.bool_()),
+        (DateTime, pa.timestamp("us")),
+        (Date, pa.timestamp("s")),
+    ]
+    for tipo_sql, tipo in tipos:
+        if isinstance(coluna.type, tipo_sql):
+            return tipo
+    return pa.string()
+
+
+def read_copy_csv(buffer, colunas):
+    import pyarrow.csv as pv
+
+    convert_options = pv.ConvertOptions(
+        column_types={coluna.name: arrow_type(coluna) for coluna in colunas},
+        true_values=["t"],
+        false_values=["f"],
+        null_values=[""],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+    )
+    return pv.read_csv(buffer, convert_options=convert_options)
+
+
+def cast_arrow(table, colunas):
+    import pyarrow as pa
+
+    for coluna in colunas:
+        i = table.schema.get_field_index(coluna.name)
+        tipo = arrow_type(coluna)
+        # string -> dictionary nao tem cast direto no Arrow
+        if pa.types.is_dictionary(tipo):
+            valores = table.column(i).cast(tipo.value_type).dictionary_encode()
+        else:
+            valores = table.column(i).cast(tipo)
+        table = table.set_column(i, coluna.name, valores)
+    return table
+
+
+def arrow_types_mapper(tipo):
+    import pyarrow as pa
+
+    # dictionary -> category e timestamp -> datetime64 (padrao do to_pandas); o resto fica em Arrow
+    if pa.types.is_dictionary(tipo) or pa.types.is_timestamp(tipo):
+        return None
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+        return pd.StringDtype("pyarrow")
+    return pd.ArrowDtype(tipo)
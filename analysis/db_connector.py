@@ -1,10 +1,10 @@
-from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 
 
 class DatabaseConnector:
     _instance = None
     _engine = None
+    _url = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -14,16 +14,24 @@ class DatabaseConnector:
     def __init__(self):
         if self._engine is None:
             from api.config import settings
-            self._engine = create_engine(
-                settings.database_url,
-                pool_pre_ping=True,
-                echo=False
-            )
+            from api.engines import engines
+
+            # mesmo engine do pacote api, com o perfil de pool do processo (DB_POOL_ROLE)
+            self._url = settings.database_url
+            self._engine = engines.engine()
 
     @property
     def engine(self) -> Engine:
         return self._engine
 
+    @property
+    def url(self) -> str:
+        return self._url
+
+    def pool_status(self) -> dict:
+        from api.pool import pool_status
+        return pool_status(self._engine, self._engine.pool.metrics)
+
     def close(self):
         if self._engine:
             self._engine.dispose()
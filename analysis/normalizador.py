@@ -2,65 +2,66 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+COLUNAS_DATA = [
+    'data_inicial_prevista',
+    'data_final_prevista',
+    'data_inicial_efetiva',
+    'data_final_efetiva',
+    'data_cadastro',
+    'data_situacao',
+    'created_at',
+    'updated_at'
+]
+
+COLUNAS_NUMERICAS = ['qdt_empregos_gerados', 'populacao_beneficiada']
+
 
 class Normalizador:
 
     @staticmethod
     def diagnosticar_problemas(df: pd.DataFrame) -> Dict[str, Any]:
-        diagnostico = {
+        nulos = df.isna().sum()
+        nulos = nulos[nulos > 0]
+
+        # um hash uint64 por linha: duplicated() sobre uma Series numerica em vez de todas as colunas
+        duplicatas = (
+            int(pd.util.hash_pandas_object(df, index=False).duplicated().sum())
+            if len(df) else 0
+        )
+
+        return {
             'total_linhas': len(df),
             'total_colunas': len(df.columns),
-            'duplicatas': df.duplicated().sum(),
-            'colunas_com_nulos': {},
+            'duplicatas': duplicatas,
+            'colunas_com_nulos': {
+                col: {
+                    'total_nulos': int(total),
+                    'percentual': round(total / len(df) * 100, 2)
+                }
+                for col, total in nulos.items()
+            },
             'tipos_de_dados': df.dtypes.to_dict(),
             'memoria_mb': df.memory_usage(deep=True).sum() / 1024**2
         }
 
-        for col in df.columns:
-            nulos = df[col].isnull().sum()
-            if nulos > 0:
-                diagnostico['colunas_com_nulos'][col] = {
-                    'total_nulos': int(nulos),
-                    'percentual': round(nulos / len(df) * 100, 2)
-                }
-
-        return diagnostico
-
     @staticmethod
-    def converter_tipos_numericos(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-
-        if 'qdt_empregos_gerados' in df.columns:
-            df['qdt_empregos_gerados'] = pd.to_numeric(
-                df['qdt_empregos_gerados'],
-                errors='coerce'
-            ).astype('Int64')
+    def converter_tipos_numericos(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        if not inplace:
+            df = df.copy()
 
-        if 'populacao_beneficiada' in df.columns:
-            df['populacao_beneficiada'] = pd.to_numeric(
-                df['populacao_beneficiada'],
-                errors='coerce'
-            ).astype('Int64')
+        for col in COLUNAS_NUMERICAS:
+            if col in df.columns and df[col].dtype != 'Int64':
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
 
         return df
 
     @staticmethod
-    def normalizar_datas(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
+    def normalizar_datas(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        if not inplace:
+            df = df.copy()
 
-        colunas_data = [
-            'data_inicial_prevista',
-            'data_final_prevista',
-            'data_inicial_efetiva',
-            'data_final_efetiva',
-            'data_cadastro',
-            'data_situacao',
-            'created_at',
-            'updated_at'
-        ]
-
-        for col in colunas_data:
-            if col in df.columns:
+        for col in COLUNAS_DATA:
+            if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
                 df[col] = pd.to_datetime(df[col], errors='coerce')
 
         return df
@@ -86,8 +87,9 @@ class Normalizador:
         return df.drop_duplicates(keep='first')
 
     @staticmethod
-    def criar_features(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
+    def criar_features(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        if not inplace:
+            df = df.copy()
 
         if 'data_inicial_prevista' in df.columns and 'data_final_prevista' in df.columns:
             df['duracao_prevista_dias'] = (
@@ -106,12 +108,19 @@ class Normalizador:
         return df
 
     @staticmethod
-    def normalizar_completo(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
+    def normalizar_completo(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        # no maximo uma copia: as etapas seguintes alteram o mesmo frame
+        if not inplace:
+            df = df.copy()
+
+        Normalizador.normalizar_datas(df, inplace=True)
+        Normalizador.converter_tipos_numericos(df, inplace=True)
+
+        if 'id_unico' in df.columns:
+            duplicadas = df.duplicated(subset=['id_unico'], keep='first')
+            if duplicadas.any():
+                df = df.loc[~duplicadas].copy()
 
-        df = Normalizador.normalizar_datas(df)
-        df = Normalizador.converter_tipos_numericos(df)
-        df = Normalizador.remover_duplicatas(df, subset=['id_unico'])
-        df = Normalizador.criar_features(df)
+        Normalizador.criar_features(df, inplace=True)
 
         return df
@@ -0,0 +1,140 @@
+import glob
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+
+# geracao lida por banco, compartilhada entre os DataLoaders do processo: (geracao, lida_em)
+_generations: Dict[str, Tuple[str, float]] = {}
+
+
+DTYPES_METADATA_KEY = b"obrasgov_dtypes"
+
+
+def dtype_name(dtype) -> str:
+    if isinstance(dtype, pd.StringDtype):
+        return f"string[{dtype.storage}]"
+    return str(dtype)
+
+
+def snapshot_key(nome: str, params) -> str:
+    def default(valor):
+        if isinstance(valor, (set, frozenset)):
+            return sorted(valor, key=str)
+        return str(valor)
+
+    payload = json.dumps([nome, params], sort_keys=True, default=default)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class SnapshotCache:
+    def __init__(
+        self,
+        engine: Engine,
+        directory: Optional[str] = None,
+        generation_ttl: Optional[float] = None
+    ):
+        from api.config import settings
+
+        self.engine = engine
+        self.directory = directory or settings.SNAPSHOT_DIR
+        self.generation_ttl = settings.SNAPSHOT_GENERATION_TTL_SECONDS if generation_ttl is None else generation_ttl
+
+    def generation(self) -> str:
+        url = str(self.engine.url)
+        now = time.monotonic()
+        cached = _generations.get(url)
+        if cached and now - cached[1] < self.generation_ttl:
+            return cached[0]
+
+        generation = self._read_generation()
+        _generations[url] = (generation, now)
+        return generation
+
+    def _read_generation(self) -> str:
+        # sync_state.generation sobe a cada pagina carregada e a cada refresh dos agregados
+        try:
+            with self.engine.connect() as conn:
+                generation = conn.execute(text("SELECT generation FROM sync_state WHERE id = 1")).scalar()
+            if generation is not None:
+                return f"g{generation}"
+        except SQLAlchemyError:
+            pass
+
+        with self.engine.connect() as conn:
+            updated_at = conn.execute(text("SELECT max(updated_at) FROM projetos_investimento")).scalar()
+        return f"u{updated_at:%Y%m%d%H%M%S%f}" if updated_at else "vazio"
+
+    def get(self, nome: str, params, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return loader()
+
+        key = snapshot_key(nome, params)
+        path = os.path.join(self.directory, f"{key}-{self.generation()}.parquet")
+
+        if os.path.exists(path):
+            try:
+                return self._read(path)
+            except (OSError, ValueError, TypeError, pa.ArrowException):
+                pass
+
+        df = loader()
+        self._write(df, path, key)
+        return df
+
+    def _read(self, path: str) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, memory_map=True)
+        df = table.to_pandas()
+
+        # o metadata do pandas nao preserva string[pyarrow] nem category toda nula
+        dtypes = json.loads((table.schema.metadata or {}).get(DTYPES_METADATA_KEY, b"{}"))
+        divergentes = {
+            coluna: dtype for coluna, dtype in dtypes.items()
+            if coluna in df.columns and dtype_name(df[coluna].dtype) != dtype
+        }
+        return df.astype(divergentes) if divergentes else df
+
+    def _write(self, df: pd.DataFrame, path: str, key: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            dtypes = {str(coluna): dtype_name(dtype) for coluna, dtype in df.dtypes.items()}
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                DTYPES_METADATA_KEY: json.dumps(dtypes).encode("utf-8"),
+            })
+
+            tmp = f"{path}.{os.getpid()}.tmp"
+            pq.write_table(table, tmp)
+            # rename atomico: outro processo lendo o diretorio nunca ve um arquivo parcial
+            os.replace(tmp, path)
+        except (OSError, pa.ArrowException) as e:
+            print(f"Erro ao gravar snapshot {path}: {str(e)}")
+            return
+
+        for antigo in glob.glob(os.path.join(self.directory, f"{key}-*.parquet")):
+            if antigo != path:
+                try:
+                    os.remove(antigo)
+                except OSError:
+                    pass
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, "*.parquet")):
+            os.remove(path)
+        _generations.pop(str(self.engine.url), None)
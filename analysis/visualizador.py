@@ -1,16 +1,15 @@
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import Optional
 
 
+# plotly, matplotlib e seaborn custam segundos para importar: cada ramo importa so o que usa
 class Visualizador:
 
     @staticmethod
     def plot_top_executores(df: pd.DataFrame, n: int = 10, tipo: str = 'plotly'):
         if tipo == 'plotly':
+            import plotly.express as px
+
             fig = px.bar(
                 df.head(n),
                 x='total_projetos',
@@ -22,6 +21,9 @@ class Visualizador:
             fig.update_layout(yaxis={'categoryorder': 'total ascending'})
             return fig
         else:
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+
             plt.figure(figsize=(12, 6))
             sns.barplot(data=df.head(n), y='nome', x='total_projetos', palette='viridis')
             plt.title(f'Top {n} Executores por Número de Projetos')
@@ -32,6 +34,8 @@ class Visualizador:
     @staticmethod
     def plot_distribuicao_situacao(df: pd.DataFrame, tipo: str = 'plotly'):
         if tipo == 'plotly':
+            import plotly.express as px
+
             fig = px.pie(
                 df,
                 values='total',
@@ -41,6 +45,8 @@ class Visualizador:
             )
             return fig
         else:
+            import matplotlib.pyplot as plt
+
             plt.figure(figsize=(10, 6))
             plt.pie(df['total'], labels=df['situacao'], autopct='%1.1f%%', startangle=90)
             plt.title('Distribuição de Projetos por Situação')
@@ -49,6 +55,8 @@ class Visualizador:
     @staticmethod
     def plot_valores_repassadores(df: pd.DataFrame, n: int = 10, tipo: str = 'plotly'):
         if tipo == 'plotly':
+            import plotly.express as px
+
             fig = px.bar(
                 df.head(n),
                 x='valor_total',
@@ -60,6 +68,9 @@ class Visualizador:
             fig.update_layout(yaxis={'categoryorder': 'total ascending'})
             return fig
         else:
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+
             plt.figure(figsize=(12, 6))
             sns.barplot(data=df.head(n), y='nome', x='valor_total', palette='magma')
             plt.title(f'Top {n} Repassadores por Valor Total')
@@ -71,6 +82,8 @@ class Visualizador:
     @staticmethod
     def plot_timeline_projetos(df: pd.DataFrame, tipo: str = 'plotly'):
         if tipo == 'plotly':
+            import plotly.express as px
+
             fig = px.line(
                 df,
                 x='ano',
@@ -81,6 +94,8 @@ class Visualizador:
             )
             return fig
         else:
+            import matplotlib.pyplot as plt
+
             plt.figure(figsize=(12, 6))
             plt.plot(df['ano'], df['total_projetos'], marker='o', linewidth=2)
             plt.title('Evolução de Cadastros de Projetos por Ano')
@@ -92,6 +107,8 @@ class Visualizador:
     @staticmethod
     def plot_histograma(df: pd.DataFrame, coluna: str, bins: int = 30, tipo: str = 'plotly'):
         if tipo == 'plotly':
+            import plotly.express as px
+
             fig = px.histogram(
                 df,
                 x=coluna,
@@ -101,6 +118,8 @@ class Visualizador:
             )
             return fig
         else:
+            import matplotlib.pyplot as plt
+
             plt.figure(figsize=(10, 6))
             plt.hist(df[coluna].dropna(), bins=bins, edgecolor='black', alpha=0.7)
             plt.title(f'Distribuição de {coluna}')
@@ -112,6 +131,8 @@ class Visualizador:
     @staticmethod
     def plot_boxplot(df: pd.DataFrame, coluna: str, tipo: str = 'plotly'):
         if tipo == 'plotly':
+            import plotly.express as px
+
             fig = px.box(
                 df,
                 y=coluna,
@@ -120,6 +141,9 @@ class Visualizador:
             )
             return fig
         else:
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+
             plt.figure(figsize=(10, 6))
             sns.boxplot(y=df[coluna].dropna())
             plt.title(f'Boxplot de {coluna}')
@@ -131,6 +155,8 @@ class Visualizador:
         corr = df.select_dtypes(include=['number']).corr()
 
         if tipo == 'plotly':
+            import plotly.express as px
+
             fig = px.imshow(
                 corr,
                 text_auto=True,
@@ -140,6 +166,9 @@ class Visualizador:
             )
             return fig
         else:
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+
             plt.figure(figsize=(12, 10))
             sns.heatmap(corr, annot=True, cmap='coolwarm', center=0, square=True)
             plt.title('Matriz de Correlação')
@@ -147,6 +176,9 @@ class Visualizador:
 
     @staticmethod
     def configurar_estilo_matplotlib():
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         sns.set_style("whitegrid")
         sns.set_palette("husl")
         plt.rcParams['figure.figsize'] = (12, 6)
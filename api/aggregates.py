@@ -0,0 +1,69 @@
+from sqlalchemy import text
+
+# agregados do dashboard; cada view tem indice unico para permitir REFRESH ... CONCURRENTLY
+AGGREGATE_VIEWS = {
+    "mv_top_executores": ("""
+        SELECT
+            e.id,
+            e.nome,
+            e.codigo,
+            COUNT(*) as total_projetos
+        FROM executores e
+        JOIN projeto_executor pe ON e.id = pe.executor_id
+        GROUP BY e.id, e.nome, e.codigo
+    """, "id"),
+    "mv_top_tomadores": ("""
+        SELECT
+            t.id,
+            t.nome,
+            t.codigo,
+            COUNT(*) as total_projetos
+        FROM tomadores t
+        JOIN projeto_tomador pt ON t.id = pt.tomador_id
+        GROUP BY t.id, t.nome, t.codigo
+    """, "id"),
+    "mv_valores_por_repassador": ("""
+        SELECT
+            r.id,
+            r.nome,
+            r.codigo,
+            COUNT(DISTINCT pr.projeto_id) as total_projetos,
+            SUM(fr.valor_investimento_previsto) as valor_total
+        FROM repassadores r
+        JOIN projeto_repassador pr ON r.id = pr.repassador_id
+        JOIN fontes_recurso fr ON pr.projeto_id = fr.projeto_id
+        GROUP BY r.id, r.nome, r.codigo
+    """, "id"),
+    "mv_distribuicao_situacao": ("""
+        SELECT
+            situacao,
+            COUNT(*) as total
+        FROM projetos_investimento
+        WHERE situacao IS NOT NULL
+        GROUP BY situacao
+    """, "situacao"),
+    "mv_projetos_por_ano": ("""
+        SELECT
+            EXTRACT(YEAR FROM data_cadastro) as ano,
+            COUNT(*) as total_projetos
+        FROM projetos_investimento
+        WHERE data_cadastro IS NOT NULL
+        GROUP BY ano
+    """, "ano"),
+}
+
+
+def create_aggregates(conn):
+    for view, (query, unique_column) in AGGREGATE_VIEWS.items():
+        conn.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view} AS {query}"))
+        conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{view} ON {view} ({unique_column})"))
+
+
+def refresh_aggregates(conn):
+    for view in AGGREGATE_VIEWS:
+        conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+
+
+def drop_aggregates(conn):
+    for view in AGGREGATE_VIEWS:
+        conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view}"))
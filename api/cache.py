@@ -0,0 +1,163 @@
+import hashlib
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api import models
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, etag: str, headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.etag = etag
+        self.headers = headers or {}
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: CachedResponse, ttl: int):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    # LRU limitado por numero de entradas e pelo total de bytes dos corpos
+    def __init__(self, max_entries: int, max_bytes: int, max_entry_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes if max_entry_bytes is None else min(max_entry_bytes, max_bytes)
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse, ttl: int):
+        with self._lock:
+            self._remove(key)
+
+            # respostas grandes (paginas de 1000 projetos) nao ocupam o cache inteiro
+            if len(value.body) > self.max_entry_bytes:
+                return
+
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self.total_bytes += len(value.body)
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, removido) = self._entries.popitem(last=False)
+                self.total_bytes -= len(removido.body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= len(entry[1].body)
+
+
+class DataGeneration:
+    # contador incrementado a cada commit de sync que altera dados; compoe as chaves de cache
+    def __init__(self):
+        self.value = 0
+
+    def current(self) -> int:
+        return self.value
+
+    def set(self, value: int):
+        if value > self.value:
+            self.value = value
+
+    def load(self, db: Session) -> int:
+        generation = db.execute(
+            select(models.SyncState.generation).where(models.SyncState.id == 1)
+        ).scalar()
+        self.set(generation or 0)
+        return self.value
+
+    def bump(self, db: Session) -> int:
+        agora = datetime.utcnow()
+        stmt = insert(models.SyncState).values(id=1, generation=1, last_sync_at=agora)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"generation": models.SyncState.generation + 1, "last_sync_at": agora}
+        ).returning(models.SyncState.generation)
+        return db.execute(stmt).scalar()
+
+
+class ResponseCache:
+    def __init__(self, generation: DataGeneration, backend: Optional[CacheBackend] = None, ttl: Optional[int] = None):
+        self.generation = generation
+        self.backend = backend or MemoryCacheBackend(
+            settings.CACHE_MAX_ENTRIES,
+            settings.CACHE_MAX_BYTES,
+            settings.CACHE_MAX_ENTRY_BYTES
+        )
+        self.ttl = ttl if ttl is not None else settings.CACHE_TTL_SECONDS
+
+    def key(self, request: Request) -> str:
+        # reencoda os valores ja decodificados: "a=X%26b%3DY" e "a=X&b=Y" nao podem colidir
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{self.generation.current()}:{request.url.path}?{query}"
+
+    async def respond(
+        self,
+        request: Request,
+        response_model: Any,
+        build: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]
+    ) -> Response:
+        key = self.key(request)
+        cached = self.backend.get(key)
+
+        if cached is None:
+            data, headers = await build()
+            adapter = TypeAdapter(response_model)
+            body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            cached = CachedResponse(body, etag, headers)
+            self.backend.set(key, cached, self.ttl)
+
+        headers = {**cached.headers, "ETag": cached.etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or cached.etag in [
+            tag.strip() for tag in if_none_match.split(",")
+        ]):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+data_generation = DataGeneration()
+response_cache = ResponseCache(data_generation)
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import declarative_base
+
+from api.engines import engines
 
 
 class Settings(BaseSettings):
@@ -14,10 +15,39 @@ class Settings(BaseSettings):
     OBRASGOV_API_TIMEOUT: int
     OBRASGOV_API_MAX_RETRIES: int
     OBRASGOV_RETRY_BACKOFF_FACTOR: int
-    OBRASGOV_DELAY_BETWEEN_REQUESTS: int
+    OBRASGOV_DELAY_BETWEEN_REQUESTS: float
+    OBRASGOV_MAX_CONCURRENT_REQUESTS: int = 4
+    OBRASGOV_HTTP2: bool = True
+    OBRASGOV_POOL_MAX_CONNECTIONS: int = 10
+    OBRASGOV_POOL_MAX_KEEPALIVE: int = 10
+    OBRASGOV_KEEPALIVE_EXPIRY: float = 60
 
     SYNC_SCHEDULE_HOUR: int
     SYNC_SCHEDULE_MINUTE: int
+    SYNC_PARSE_WORKERS: int = 2
+    SYNC_LOAD_WORKERS: int = 2
+    SYNC_QUEUE_SIZE: int = 8
+    SYNC_UFS: str = "DF"
+    SYNC_PROCESSES: int = 4
+
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_MAX_ENTRY_BYTES: int = 2 * 1024 * 1024
+
+    SNAPSHOT_ENABLED: bool = True
+    SNAPSHOT_DIR: str = "/tmp/obrasgov_snapshots"
+    SNAPSHOT_GENERATION_TTL_SECONDS: float = 30
+
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_USE_LIFO: bool = True
+    DB_POOL_VALIDATION_INTERVAL: float = 60
+    DB_POOL_ROLE: str = "api"
 
     @property
     def database_url(self) -> str:
@@ -26,6 +56,10 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        return self.database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -33,20 +67,32 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    echo=False,
-)
+# engine, async_engine, SessionLocal e AsyncSessionLocal sao criados no primeiro acesso (api.engines)
+LAZY_ATTRIBUTES = {
+    "engine": engines.engine,
+    "async_engine": engines.async_engine,
+    "SessionLocal": engines.sessionmaker,
+    "AsyncSessionLocal": engines.async_sessionmaker,
+}
+
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        return LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
 def get_db():
-    db = SessionLocal()
+    db = engines.sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with engines.async_sessionmaker()() as db:
+        yield db
@@ -1,11 +1,37 @@
+from sqlalchemy import inspect, text
+
+from api.aggregates import create_aggregates, drop_aggregates
 from api.config import Base, engine
 
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    upgrade_db()
+
+    with engine.begin() as conn:
+        create_aggregates(conn)
+
+
+def upgrade_db():
+    # create_all nao altera tabelas existentes; adiciona colunas novas (sempre nullable) e indices
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            colunas = {coluna["name"] for coluna in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in colunas:
+                    tipo = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column.name} {tipo}"
+                    ))
+
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
 
 
 def drop_db():
+    with engine.begin() as conn:
+        drop_aggregates(conn)
     Base.metadata.drop_all(bind=engine)
 
 
@@ -0,0 +1,120 @@
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from api.pool import (
+    MeteredAsyncAdaptedQueuePool,
+    MeteredQueuePool,
+    instrument,
+    pool_options,
+    start_validation_thread,
+)
+
+# ajustes por papel do processo sobre os DB_POOL_* do .env (DB_POOL_ROLE escolhe o papel)
+POOL_PROFILES = {
+    "api": {},
+    "dashboard": {"pool_size": 5, "max_overflow": 5},
+    "notebook": {"pool_size": 1, "max_overflow": 2, "pool_use_lifo": False},
+}
+
+
+class EngineRegistry:
+    # um engine sincrono e um async por processo, criados no primeiro uso e compartilhados por api e analysis
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+        self._async_engine: Optional[AsyncEngine] = None
+        self._sessionmaker: Optional[sessionmaker] = None
+        self._async_sessionmaker: Optional[async_sessionmaker] = None
+        self._validation_thread: Optional[threading.Thread] = None
+
+    @property
+    def role(self) -> str:
+        from api.config import settings
+
+        if settings.DB_POOL_ROLE not in POOL_PROFILES:
+            raise ValueError(f"DB_POOL_ROLE inválido: {settings.DB_POOL_ROLE}. Use um de {list(POOL_PROFILES)}")
+        return settings.DB_POOL_ROLE
+
+    def options(self) -> dict:
+        from api.config import settings
+
+        return {**pool_options(settings), **POOL_PROFILES[self.role]}
+
+    def engine(self) -> Engine:
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = self._create_engine()
+        return self._engine
+
+    def async_engine(self) -> AsyncEngine:
+        if self._async_engine is None:
+            with self._lock:
+                if self._async_engine is None:
+                    from api.config import settings
+
+                    async_engine = create_async_engine(
+                        settings.async_database_url,
+                        poolclass=MeteredAsyncAdaptedQueuePool,
+                        **self.options(),
+                        echo=False,
+                    )
+                    instrument(async_engine.sync_engine, f"{self.role}_async")
+                    self._async_engine = async_engine
+        return self._async_engine
+
+    def sessionmaker(self) -> sessionmaker:
+        if self._sessionmaker is None:
+            self._sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine())
+        return self._sessionmaker
+
+    def async_sessionmaker(self) -> async_sessionmaker:
+        if self._async_sessionmaker is None:
+            self._async_sessionmaker = async_sessionmaker(self.async_engine(), autoflush=False, expire_on_commit=False)
+        return self._async_sessionmaker
+
+    def _create_engine(self) -> Engine:
+        from api.config import settings
+
+        # sem pool_pre_ping: conexoes ociosas sao validadas em background (api.pool.validate_pool)
+        engine = create_engine(
+            settings.database_url,
+            poolclass=MeteredQueuePool,
+            **self.options(),
+            echo=False,
+        )
+        instrument(engine, self.role)
+
+        # na API a validacao roda no scheduler; dashboard e notebooks usam uma thread
+        if self.role != "api" and settings.DB_POOL_VALIDATION_INTERVAL > 0:
+            self._validation_thread = start_validation_thread(engine, settings.DB_POOL_VALIDATION_INTERVAL)
+        return engine
+
+    def after_fork_in_child(self):
+        # o filho herda os sockets do pai: descarta o pool sem fechar as conexoes dele
+        self._lock = threading.Lock()
+        if self._engine is not None:
+            self._engine.dispose(close=False)
+        if self._async_engine is not None:
+            self._async_engine.sync_engine.dispose(close=False)
+
+        # threads nao sobrevivem ao fork
+        if self._validation_thread is not None:
+            from api.config import settings
+            self._validation_thread = start_validation_thread(self._engine, settings.DB_POOL_VALIDATION_INTERVAL)
+
+    def dispose(self):
+        if self._engine is not None:
+            self._engine.dispose()
+
+
+engines = EngineRegistry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=engines.after_fork_in_child)
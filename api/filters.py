@@ -0,0 +1,60 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import select
+
+from api import models
+
+
+class ProjetoFiltros:
+    def __init__(
+        self,
+        uf: Optional[str] = None,
+        situacao: Optional[str] = None,
+        natureza: Optional[str] = None,
+        especie: Optional[str] = None,
+        data_cadastro_inicio: Optional[date] = None,
+        data_cadastro_fim: Optional[date] = None,
+        executor_codigo: Optional[int] = None,
+        repassador_codigo: Optional[int] = None
+    ):
+        self.uf = uf
+        self.situacao = situacao
+        self.natureza = natureza
+        self.especie = especie
+        self.data_cadastro_inicio = data_cadastro_inicio
+        self.data_cadastro_fim = data_cadastro_fim
+        self.executor_codigo = executor_codigo
+        self.repassador_codigo = repassador_codigo
+
+    def conditions(self) -> list:
+        projeto = models.ProjetoInvestimento
+        conditions = []
+
+        if self.uf:
+            conditions.append(projeto.uf == self.uf)
+        if self.situacao:
+            conditions.append(projeto.situacao == self.situacao)
+        if self.natureza:
+            conditions.append(projeto.natureza == self.natureza)
+        if self.especie:
+            conditions.append(projeto.especie == self.especie)
+        if self.data_cadastro_inicio:
+            conditions.append(projeto.data_cadastro >= self.data_cadastro_inicio)
+        if self.data_cadastro_fim:
+            conditions.append(projeto.data_cadastro <= self.data_cadastro_fim)
+
+        if self.executor_codigo is not None:
+            conditions.append(projeto.id.in_(
+                select(models.ProjetoExecutor.projeto_id)
+                .join(models.Executor, models.Executor.id == models.ProjetoExecutor.executor_id)
+                .where(models.Executor.codigo == self.executor_codigo)
+            ))
+        if self.repassador_codigo is not None:
+            conditions.append(projeto.id.in_(
+                select(models.ProjetoRepassador.projeto_id)
+                .join(models.Repassador, models.Repassador.id == models.ProjetoRepassador.repassador_id)
+                .where(models.Repassador.codigo == self.repassador_codigo)
+            ))
+
+        return conditions
@@ -1,37 +1,37 @@
+import asyncio
+import importlib.util
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, raiseload
+from sqlalchemy import select, text
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from api.config import settings, get_db
+from api.config import settings, engine, async_engine, get_async_db
 from api import models, schemas
+from api.cache import data_generation, response_cache
 from api.database import init_db
+from api.filters import ProjetoFiltros
+from api.pool import pools_status, validate_async_pool, validate_pool
 from api.services.obrasgov_client import ObrasGovClient
-from api.services.data_processor import DataProcessor
+from api.services.sync_service import sync_jobs
+from api.services import exporter
 
 scheduler = AsyncIOScheduler()
+obrasgov_client = ObrasGovClient()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    load_data_generation()
 
-    try:
-        from api.config import SessionLocal
-        db = SessionLocal()
-        try:
-            await sync_projects(uf="DF", db=db)
-            print("Sync inicial executado com sucesso!")
-        except Exception as e:
-            print(f"Erro no sync inicial: {str(e)}")
-        finally:
-            db.close()
-    except Exception as e:
-        print(f"Erro na configuração do sync inicial: {str(e)}")
+    # sync inicial em background: a API atende leituras enquanto carrega
+    app.state.initial_sync_job = sync_jobs.start(settings.SYNC_UFS, obrasgov_client)
 
     scheduler.add_job(
         scheduled_sync,
@@ -39,11 +39,31 @@ async def lifespan(app: FastAPI):
         hour=settings.SYNC_SCHEDULE_HOUR,
         minute=settings.SYNC_SCHEDULE_MINUTE
     )
+    if settings.DB_POOL_VALIDATION_INTERVAL > 0:
+        scheduler.add_job(
+            validate_pools,
+            'interval',
+            seconds=settings.DB_POOL_VALIDATION_INTERVAL,
+            max_instances=1,
+            coalesce=True
+        )
     scheduler.start()
 
     yield
 
     scheduler.shutdown()
+    await sync_jobs.cancel_all()
+    await obrasgov_client.aclose()
+    await async_engine.dispose()
+
+
+def load_data_generation():
+    from api.config import SessionLocal
+    db = SessionLocal()
+    try:
+        data_generation.load(db)
+    finally:
+        db.close()
 
 
 app = FastAPI(
@@ -60,9 +80,9 @@ async def root():
 
 
 @app.get("/health", response_model=schemas.HealthResponse, tags=["Health"])
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         db_status = "connected"
     except Exception as e:
         db_status = f"error: {str(e)}"
@@ -75,104 +95,216 @@ async def health_check(db: Session = Depends(get_db)):
 
 
 @app.get("/ready", tags=["Health"])
-async def readiness_check(db: Session = Depends(get_db)):
-    try:
-        db.execute(text("SELECT 1"))
-        projeto_count = db.query(models.ProjetoInvestimento).count()
+async def readiness_check(request: Request, db: AsyncSession = Depends(get_async_db)):
+    job = getattr(request.app.state, "initial_sync_job", None)
+    sync_status = schemas.SyncJobResponse.model_validate(job).model_dump(mode="json") if job else None
 
-        if projeto_count == 0:
-            raise HTTPException(
-                status_code=503,
-                detail="Database not populated yet. Initial sync still running."
-            )
-
-        return {
-            "status": "ready",
-            "database": "connected",
-            "projects_count": projeto_count,
-            "timestamp": datetime.utcnow()
-        }
-    except HTTPException:
-        raise
+    try:
+        populated = await db.scalar(select(models.ProjetoInvestimento.id).limit(1)) is not None
     except Exception as e:
         raise HTTPException(
             status_code=503,
             detail=f"Service not ready: {str(e)}"
         )
 
+    if not populated:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "message": "Database not populated yet. Initial sync still running.",
+                "sync": sync_status
+            }
+        )
+
+    # estimativa do planner (pg_class.reltuples): o healthcheck chama /ready a cada 5s e count(*) varre a tabela
+    estimativa = await db.scalar(text(
+        "SELECT reltuples::bigint FROM pg_class WHERE oid = 'projetos_investimento'::regclass"
+    ))
+
+    return {
+        "status": "ready",
+        "database": "connected",
+        "projects_count_estimate": estimativa if estimativa is not None and estimativa >= 0 else None,
+        "sync": sync_status,
+        "timestamp": datetime.utcnow()
+    }
 
-@app.post("/sync", response_model=schemas.SyncResponse, tags=["Sincronização"])
-async def sync_projects(uf: str = "DF", db: Session = Depends(get_db)):
-    start_time = datetime.utcnow()
 
+@app.post("/sync", response_model=schemas.SyncJobResponse, status_code=202, tags=["Sincronização"])
+async def sync_projects(uf: str = "DF"):
     try:
-        client = ObrasGovClient()
-        processor = DataProcessor(db)
-        total_projetos = 0
-
-        async for page_response in client.fetch_all(uf):
-            for projeto_data in page_response.content:
-                try:
-                    processor.process_projeto(projeto_data)
-                    total_projetos += 1
-                except Exception as e:
-                    continue
-
-            db.commit()
-
-        total_executores = db.query(models.Executor).count()
-        total_tomadores = db.query(models.Tomador).count()
-        total_repassadores = db.query(models.Repassador).count()
-
-        return schemas.SyncResponse(
-            message=f"Sincronização concluída com sucesso para {uf}",
-            total_projetos=total_projetos,
-            total_executores=total_executores,
-            total_tomadores=total_tomadores,
-            total_repassadores=total_repassadores,
-            sync_time=str(datetime.utcnow() - start_time)
-        )
+        return sync_jobs.start(uf, obrasgov_client)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Erro na sincronização: {str(e)}")
+
+@app.get("/sync/{job_id}", response_model=schemas.SyncJobResponse, tags=["Sincronização"])
+async def get_sync_job(job_id: str):
+    job = sync_jobs.get(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job de sincronização não encontrado")
+
+    return job
 
 
 @app.get("/projetos", response_model=List[schemas.ProjetoResponse], tags=["Projetos"])
 async def list_projects(
-    skip: int = 0,
-    limit: int = 100,
-    uf: str = None,
-    db: Session = Depends(get_db)
+    request: Request,
+    after_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    filtros: ProjetoFiltros = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    async def build():
+        query = select(models.ProjetoInvestimento).where(*filtros.conditions())
+
+        # paginacao por cursor (keyset em id); skip mantido por compatibilidade
+        if after_id is not None:
+            query = query.where(models.ProjetoInvestimento.id > after_id)
+        elif skip:
+            query = query.offset(skip)
+
+        projetos = (await db.scalars(query.order_by(models.ProjetoInvestimento.id).limit(limit))).all()
+
+        headers = {}
+        if projetos and len(projetos) == limit:
+            headers["X-Next-Cursor"] = str(projetos[-1].id)
+
+        return projetos, headers
+
+    return await response_cache.respond(request, List[schemas.ProjetoResponse], build)
+
+
+@app.get("/projetos/export", tags=["Projetos"])
+def export_projects(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    filtros: ProjetoFiltros = Depends()
 ):
-    query = db.query(models.ProjetoInvestimento)
+    if format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise HTTPException(status_code=501, detail="Exportação Parquet requer pyarrow instalado")
+
+    media_type, extensao = exporter.FORMATOS[format]
+    return StreamingResponse(
+        exporter.stream_export(format, filtros),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="projetos.{extensao}"'}
+    )
+
+
+# uma query por relacao (selectin), independente do numero de projetos; raiseload barra lazy loads
+PROJETO_DETALHE_OPTIONS = [
+    selectinload(models.ProjetoInvestimento.executores),
+    selectinload(models.ProjetoInvestimento.tomadores),
+    selectinload(models.ProjetoInvestimento.repassadores),
+    selectinload(models.ProjetoInvestimento.eixos),
+    selectinload(models.ProjetoInvestimento.tipos),
+    selectinload(models.ProjetoInvestimento.subtipos),
+    selectinload(models.ProjetoInvestimento.fontes_recurso),
+    raiseload("*"),
+]
+
+
+@app.get("/projetos/{id_unico}", response_model=schemas.ProjetoDetalheResponse, tags=["Projetos"])
+async def get_project(id_unico: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def build():
+        projeto = await db.scalar(
+            select(models.ProjetoInvestimento).options(*PROJETO_DETALHE_OPTIONS).where(
+                models.ProjetoInvestimento.id_unico == id_unico
+            )
+        )
+
+        if not projeto:
+            raise HTTPException(status_code=404, detail="Projeto não encontrado")
+
+        return projeto, {}
+
+    return await response_cache.respond(request, schemas.ProjetoDetalheResponse, build)
+
+
+@app.post("/projetos/batch", response_model=List[schemas.ProjetoDetalheResponse], tags=["Projetos"])
+async def get_projects_batch(request: schemas.ProjetoBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    projetos = (await db.scalars(
+        select(models.ProjetoInvestimento).options(*PROJETO_DETALHE_OPTIONS).where(
+            models.ProjetoInvestimento.id_unico.in_(set(request.ids))
+        )
+    )).all()
+
+    por_id_unico = {projeto.id_unico: projeto for projeto in projetos}
+    return [por_id_unico[id_unico] for id_unico in dict.fromkeys(request.ids) if id_unico in por_id_unico]
+
 
-    if uf:
-        query = query.filter(models.ProjetoInvestimento.uf == uf)
+async def stats_response(request: Request, db: AsyncSession, response_model, query: str, params: Optional[dict] = None):
+    async def build():
+        rows = (await db.execute(text(query), params or {})).mappings().all()
+        return [dict(row) for row in rows], {}
 
-    projetos = query.offset(skip).limit(limit).all()
-    return projetos
+    return await response_cache.respond(request, response_model, build)
 
 
-@app.get("/projetos/{id_unico}", response_model=schemas.ProjetoResponse, tags=["Projetos"])
-async def get_project(id_unico: str, db: Session = Depends(get_db)):
-    projeto = db.query(models.ProjetoInvestimento).filter(
-        models.ProjetoInvestimento.id_unico == id_unico
-    ).first()
+@app.get("/stats/situacao", response_model=List[schemas.SituacaoStatsResponse], tags=["Estatísticas"])
+async def stats_situacao(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await stats_response(request, db, List[schemas.SituacaoStatsResponse], """
+        SELECT situacao, total
+        FROM mv_distribuicao_situacao
+        ORDER BY total DESC
+    """)
 
-    if not projeto:
-        raise HTTPException(status_code=404, detail="Projeto não encontrado")
 
-    return projeto
+@app.get("/stats/executores/top", response_model=List[schemas.EntidadeStatsResponse], tags=["Estatísticas"])
+async def stats_top_executores(request: Request, n: int = Query(10, ge=1, le=1000), db: AsyncSession = Depends(get_async_db)):
+    return await stats_response(request, db, List[schemas.EntidadeStatsResponse], """
+        SELECT nome, codigo, total_projetos
+        FROM mv_top_executores
+        ORDER BY total_projetos DESC
+        LIMIT :n
+    """, {"n": n})
+
+
+@app.get("/stats/tomadores/top", response_model=List[schemas.EntidadeStatsResponse], tags=["Estatísticas"])
+async def stats_top_tomadores(request: Request, n: int = Query(10, ge=1, le=1000), db: AsyncSession = Depends(get_async_db)):
+    return await stats_response(request, db, List[schemas.EntidadeStatsResponse], """
+        SELECT nome, codigo, total_projetos
+        FROM mv_top_tomadores
+        ORDER BY total_projetos DESC
+        LIMIT :n
+    """, {"n": n})
+
+
+@app.get("/stats/repassadores/valores", response_model=List[schemas.RepassadorValoresResponse], tags=["Estatísticas"])
+async def stats_valores_repassadores(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await stats_response(request, db, List[schemas.RepassadorValoresResponse], """
+        SELECT nome, codigo, total_projetos, valor_total
+        FROM mv_valores_por_repassador
+        ORDER BY valor_total DESC
+    """)
+
+
+@app.get("/stats/temporal", response_model=List[schemas.TemporalStatsResponse], tags=["Estatísticas"])
+async def stats_temporal(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await stats_response(request, db, List[schemas.TemporalStatsResponse], """
+        SELECT ano, total_projetos
+        FROM mv_projetos_por_ano
+        ORDER BY ano
+    """)
+
+
+@app.get("/metrics/pool", response_model=Dict[str, schemas.PoolStatusResponse], tags=["Health"])
+async def pool_metrics():
+    return pools_status()
 
 
 async def scheduled_sync():
-    from api.config import SessionLocal
-    db = SessionLocal()
+    sync_jobs.start(settings.SYNC_UFS, obrasgov_client)
+
+
+async def validate_pools():
     try:
-        await sync_projects(uf="DF", db=db)
-    finally:
-        db.close()
+        await validate_async_pool(async_engine)
+        await asyncio.to_thread(validate_pool, engine)
+    except Exception as e:
+        print(f"Erro na validação do pool: {str(e)}")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,17 @@
 from datetime import datetime, date
-from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, Date, Text, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, Date, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from api.config import Base
 
 
 class ProjetoInvestimento(Base):
     __tablename__ = "projetos_investimento"
+    __table_args__ = (
+        Index("ix_projetos_uf_id", "uf", "id"),
+        Index("ix_projetos_situacao_id", "situacao", "id"),
+        Index("ix_projetos_data_cadastro_id", "data_cadastro", "id"),
+        Index("ix_projetos_natureza_especie_id", "natureza", "especie", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     id_unico = Column(String(20), unique=True, index=True, nullable=False)
@@ -39,6 +45,8 @@ class ProjetoInvestimento(Base):
     observacoes_pertinentes = Column(Text, nullable=True)
     is_modelada_por_bim = Column(Boolean, default=False)
 
+    content_hash = Column(String(64), nullable=True)
+
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -127,6 +135,9 @@ class FonteRecurso(Base):
 
 class ProjetoExecutor(Base):
     __tablename__ = "projeto_executor"
+    __table_args__ = (
+        Index("ix_projeto_executor_executor_projeto", "executor_id", "projeto_id"),
+    )
 
     projeto_id = Column(Integer, ForeignKey("projetos_investimento.id"), primary_key=True)
     executor_id = Column(Integer, ForeignKey("executores.id"), primary_key=True)
@@ -141,6 +152,9 @@ class ProjetoTomador(Base):
 
 class ProjetoRepassador(Base):
     __tablename__ = "projeto_repassador"
+    __table_args__ = (
+        Index("ix_projeto_repassador_repassador_projeto", "repassador_id", "projeto_id"),
+    )
 
     projeto_id = Column(Integer, ForeignKey("projetos_investimento.id"), primary_key=True)
     repassador_id = Column(Integer, ForeignKey("repassadores.id"), primary_key=True)
@@ -165,3 +179,11 @@ class ProjetoSubtipo(Base):
 
     projeto_id = Column(Integer, ForeignKey("projetos_investimento.id"), primary_key=True)
     subtipo_id = Column(Integer, ForeignKey("subtipos.id"), primary_key=True)
+
+
+class SyncState(Base):
+    __tablename__ = "sync_state"
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(BigInteger, nullable=False, default=0)
+    last_sync_at = Column(DateTime, nullable=True)
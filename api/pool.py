@@ -0,0 +1,179 @@
+import threading
+import time
+from contextlib import AsyncExitStack
+from typing import Dict, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.validations = 0
+        self.validation_failures = 0
+
+    def incr(self, campo: str, valor: int = 1):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + valor)
+
+    def observe_wait(self, segundos: float):
+        with self._lock:
+            self.wait_seconds_total += segundos
+            self.wait_seconds_max = max(self.wait_seconds_max, segundos)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "validations": self.validations,
+                "validation_failures": self.validation_failures,
+            }
+
+
+class MeteredPoolMixin:
+    metrics: PoolMetrics
+
+    def connect(self):
+        # tempo de checkout: espera na fila + eventual abertura de conexao
+        inicio = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.incr("timeouts")
+            raise
+        finally:
+            self.metrics.observe_wait(time.perf_counter() - inicio)
+
+    def recreate(self):
+        # dispose()/invalidacao recriam o pool; as metricas continuam acumulando
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredQueuePool(MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncAdaptedQueuePool(MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# nome -> (engine sincrono, metricas)
+POOLS: Dict[str, Tuple[Engine, PoolMetrics]] = {}
+
+
+def pool_options(settings) -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+    }
+
+
+def instrument(engine: Engine, nome: str) -> PoolMetrics:
+    metrics = PoolMetrics()
+    engine.pool.metrics = metrics
+
+    # listeners ficam no dispatch, que o pool recriado herda
+    event.listen(engine.pool, "checkout", lambda *args: metrics.incr("checkouts"))
+    event.listen(engine.pool, "checkin", lambda *args: metrics.incr("checkins"))
+    event.listen(engine.pool, "connect", lambda *args: metrics.incr("connects"))
+    event.listen(engine.pool, "invalidate", lambda *args: metrics.incr("invalidations"))
+    event.listen(engine.pool, "soft_invalidate", lambda *args: metrics.incr("soft_invalidations"))
+
+    POOLS[nome] = (engine, metrics)
+    return metrics
+
+
+def pool_status(engine: Engine, metrics: PoolMetrics) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        **metrics.snapshot(),
+    }
+
+
+def pools_status() -> dict:
+    return {nome: pool_status(engine, metrics) for nome, (engine, metrics) in POOLS.items()}
+
+
+def validate_pool(engine: Engine) -> int:
+    # substitui o pre_ping: testa as conexoes ociosas fora do caminho das requisicoes
+    metrics: PoolMetrics = engine.pool.metrics
+    falhas = 0
+    conexoes = []
+    try:
+        for _ in range(engine.pool.checkedin()):
+            conn = engine.connect()
+            conexoes.append(conn)
+            try:
+                conn.exec_driver_sql("SELECT 1")
+            except exc.DBAPIError:
+                falhas += 1
+                if not conn.invalidated:
+                    conn.invalidate()
+    finally:
+        for conn in conexoes:
+            conn.close()
+
+    metrics.incr("validations", len(conexoes))
+    metrics.incr("validation_failures", falhas)
+    return falhas
+
+
+async def validate_async_pool(engine) -> int:
+    metrics: PoolMetrics = engine.pool.metrics
+    falhas = 0
+    validadas = 0
+    async with AsyncExitStack() as stack:
+        for _ in range(engine.pool.checkedin()):
+            conn = await stack.enter_async_context(engine.connect())
+            validadas += 1
+            try:
+                await conn.exec_driver_sql("SELECT 1")
+            except exc.DBAPIError:
+                falhas += 1
+                if not conn.invalidated:
+                    await conn.invalidate()
+
+    metrics.incr("validations", validadas)
+    metrics.incr("validation_failures", falhas)
+    return falhas
+
+
+def start_validation_thread(engine: Engine, interval: float) -> threading.Thread:
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                validate_pool(engine)
+            except Exception as e:
+                print(f"Erro na validação do pool: {str(e)}")
+
+    thread = threading.Thread(target=loop, name="pool-validation", daemon=True)
+    thread.start()
+    return thread
@@ -1,6 +1,6 @@
 from typing import List, Optional
 from datetime import date, datetime, timedelta
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ExecutorAPI(BaseModel):
@@ -90,13 +90,27 @@ class APIResponse(BaseModel):
     size: Optional[int] = None
 
 
-class SyncResponse(BaseModel):
-    message: str
+class SyncJobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    job_id: str
+    uf: str
+    ufs: List[str]
+    ufs_done: List[str]
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    pages_done: int
+    total_pages: Optional[int]
     total_projetos: int
-    total_executores: int
-    total_tomadores: int
-    total_repassadores: int
-    sync_time: str
+    projetos_alterados: int
+    rows_per_second: float
+    eta_seconds: Optional[float]
+    errors: List[str]
+    total_executores: Optional[int]
+    total_tomadores: Optional[int]
+    total_repassadores: Optional[int]
 
 
 class ProjetoResponse(BaseModel):
@@ -112,6 +126,135 @@ class ProjetoResponse(BaseModel):
     updated_at: datetime
 
 
+class ExecutorResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    nome: str
+    codigo: int
+
+
+class TomadorResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    nome: str
+    codigo: int
+
+
+class RepassadorResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    nome: str
+    codigo: int
+
+
+class EixoResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    descricao: str
+
+
+class TipoResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    descricao: str
+    eixo_id: int
+
+
+class SubtipoResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    descricao: str
+    tipo_id: int
+
+
+class FonteRecursoResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    origem: str
+    valor_investimento_previsto: Optional[float]
+
+
+class ProjetoDetalheResponse(ProjetoResponse):
+    cep: Optional[str]
+    endereco: Optional[str]
+    descricao: Optional[str]
+    funcao_social: Optional[str]
+    meta_global: Optional[str]
+
+    data_inicial_prevista: Optional[date]
+    data_final_prevista: Optional[date]
+    data_inicial_efetiva: Optional[date]
+    data_final_efetiva: Optional[date]
+    data_situacao: Optional[date]
+
+    especie: Optional[str]
+    natureza: Optional[str]
+    natureza_outras: Optional[str]
+
+    desc_plano_nacional_politica_vinculado: Optional[str]
+    qdt_empregos_gerados: Optional[str]
+    desc_populacao_beneficiada: Optional[str]
+    populacao_beneficiada: Optional[str]
+    observacoes_pertinentes: Optional[str]
+    is_modelada_por_bim: Optional[bool]
+
+    executores: List[ExecutorResponse] = []
+    tomadores: List[TomadorResponse] = []
+    repassadores: List[RepassadorResponse] = []
+    eixos: List[EixoResponse] = []
+    tipos: List[TipoResponse] = []
+    subtipos: List[SubtipoResponse] = []
+    fontes_recurso: List[FonteRecursoResponse] = []
+
+
+class ProjetoBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=500)
+
+
+class SituacaoStatsResponse(BaseModel):
+    situacao: str
+    total: int
+
+
+class EntidadeStatsResponse(BaseModel):
+    nome: str
+    codigo: int
+    total_projetos: int
+
+
+class RepassadorValoresResponse(BaseModel):
+    nome: str
+    codigo: int
+    total_projetos: int
+    valor_total: Optional[float]
+
+
+class TemporalStatsResponse(BaseModel):
+    ano: int
+    total_projetos: int
+
+
+class PoolStatusResponse(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    checkins: int
+    connects: int
+    invalidations: int
+    soft_invalidations: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_avg: float
+    wait_seconds_max: float
+    validations: int
+    validation_failures: int
+
+
 class HealthResponse(BaseModel):
     status: str
     database: str
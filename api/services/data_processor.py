@@ -1,8 +1,21 @@
+import hashlib
 from datetime import datetime
+from typing import List
+from sqlalchemy import select, delete, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from api import models, schemas
 
+ASSOCIACOES = [
+    models.ProjetoExecutor,
+    models.ProjetoTomador,
+    models.ProjetoRepassador,
+    models.ProjetoEixo,
+    models.ProjetoTipo,
+    models.ProjetoSubtipo,
+]
+
 
 class DataProcessor:
     def __init__(self, db: Session):
@@ -64,40 +77,55 @@ class DataProcessor:
         except:
             return None
 
-    def process_projeto(self, projeto_data: schemas.ProjetoInvestimentoAPI):
+    def content_hash(self, projeto_data: schemas.ProjetoInvestimentoAPI) -> str:
+        return hashlib.sha256(projeto_data.model_dump_json().encode()).hexdigest()
+
+    def projeto_values(self, projeto_data: schemas.ProjetoInvestimentoAPI) -> dict:
+        return {
+            "id_unico": projeto_data.idUnico,
+            "nome": projeto_data.nome,
+            "cep": projeto_data.cep,
+            "endereco": projeto_data.endereco,
+            "descricao": projeto_data.descricao,
+            "funcao_social": projeto_data.funcaoSocial,
+            "meta_global": projeto_data.metaGlobal,
+            "data_inicial_prevista": self.parse_date(projeto_data.dataInicialPrevista),
+            "data_final_prevista": self.parse_date(projeto_data.dataFinalPrevista),
+            "data_inicial_efetiva": self.parse_date(projeto_data.dataInicialEfetiva),
+            "data_final_efetiva": self.parse_date(projeto_data.dataFinalEfetiva),
+            "data_cadastro": self.parse_date(projeto_data.dataCadastro),
+            "data_situacao": self.parse_date(projeto_data.dataSituacao),
+            "especie": projeto_data.especie,
+            "natureza": projeto_data.natureza,
+            "natureza_outras": projeto_data.naturezaOutras,
+            "situacao": projeto_data.situacao,
+            "desc_plano_nacional_politica_vinculado": projeto_data.descPlanoNacionalPoliticaVinculado,
+            "uf": projeto_data.uf,
+            "qdt_empregos_gerados": projeto_data.qdtEmpregosGerados,
+            "desc_populacao_beneficiada": projeto_data.descPopulacaoBeneficiada,
+            "populacao_beneficiada": projeto_data.populacaoBeneficiada,
+            "observacoes_pertinentes": projeto_data.observacoesPertinentes,
+            "is_modelada_por_bim": projeto_data.isModeladaPorBim,
+            "content_hash": self.content_hash(projeto_data),
+        }
+
+    def process_projeto(self, projeto_data: schemas.ProjetoInvestimentoAPI) -> bool:
+        # retorna se o projeto foi gravado (False quando o hash nao mudou)
         projeto = self.db.query(models.ProjetoInvestimento).filter(
             models.ProjetoInvestimento.id_unico == projeto_data.idUnico
         ).first()
 
+        valores = self.projeto_values(projeto_data)
+
         if projeto:
+            if projeto.content_hash == valores["content_hash"]:
+                return False
+            for campo, valor in valores.items():
+                if getattr(projeto, campo) != valor:
+                    setattr(projeto, campo, valor)
             projeto.updated_at = datetime.utcnow()
         else:
-            projeto = models.ProjetoInvestimento(
-                id_unico=projeto_data.idUnico,
-                nome=projeto_data.nome,
-                cep=projeto_data.cep,
-                endereco=projeto_data.endereco,
-                descricao=projeto_data.descricao,
-                funcao_social=projeto_data.funcaoSocial,
-                meta_global=projeto_data.metaGlobal,
-                data_inicial_prevista=self.parse_date(projeto_data.dataInicialPrevista),
-                data_final_prevista=self.parse_date(projeto_data.dataFinalPrevista),
-                data_inicial_efetiva=self.parse_date(projeto_data.dataInicialEfetiva),
-                data_final_efetiva=self.parse_date(projeto_data.dataFinalEfetiva),
-                data_cadastro=self.parse_date(projeto_data.dataCadastro),
-                data_situacao=self.parse_date(projeto_data.dataSituacao),
-                especie=projeto_data.especie,
-                natureza=projeto_data.natureza,
-                natureza_outras=projeto_data.naturezaOutras,
-                situacao=projeto_data.situacao,
-                desc_plano_nacional_politica_vinculado=projeto_data.descPlanoNacionalPoliticaVinculado,
-                uf=projeto_data.uf,
-                qdt_empregos_gerados=projeto_data.qdtEmpregosGerados,
-                desc_populacao_beneficiada=projeto_data.descPopulacaoBeneficiada,
-                populacao_beneficiada=projeto_data.populacaoBeneficiada,
-                observacoes_pertinentes=projeto_data.observacoesPertinentes,
-                is_modelada_por_bim=projeto_data.isModeladaPorBim
-            )
+            projeto = models.ProjetoInvestimento(**valores)
             self.db.add(projeto)
 
         self.db.flush()
@@ -146,3 +174,170 @@ class DataProcessor:
                 valor_investimento_previsto=fonte_data.valorInvestimentoPrevisto
             )
             self.db.add(fonte)
+
+        return True
+
+    def upsert_por_codigo(self, model, itens: list) -> dict:
+        registros = {item.codigo: {"nome": item.nome, "codigo": item.codigo} for item in itens}
+        if not registros:
+            return {}
+
+        # ordem fixa das chaves evita deadlock entre cargas concorrentes
+        codigos = sorted(registros)
+        self.db.execute(
+            insert(model)
+            .values([registros[codigo] for codigo in codigos])
+            .on_conflict_do_nothing(index_elements=["codigo"])
+        )
+        rows = self.db.execute(select(model.codigo, model.id).where(model.codigo.in_(codigos)))
+        return dict(rows.all())
+
+    def insert_ignorando_existentes(self, model, registros: dict):
+        if not registros:
+            return
+
+        self.db.execute(
+            insert(model)
+            .values([registros[chave] for chave in sorted(registros)])
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+
+    def upsert_projetos(self, valores: List[dict]) -> dict:
+        agora = datetime.utcnow()
+        valores = [{**projeto_valores, "created_at": agora, "updated_at": agora} for projeto_valores in valores]
+
+        stmt = insert(models.ProjetoInvestimento).values(valores)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id_unico"],
+            set_={
+                campo: getattr(stmt.excluded, campo)
+                for campo in valores[0]
+                if campo not in ("id_unico", "created_at")
+            }
+        ).returning(models.ProjetoInvestimento.id_unico, models.ProjetoInvestimento.id)
+
+        return dict(self.db.execute(stmt).all())
+
+    def insert_associacoes(self, model, coluna: str, pares: set):
+        if not pares:
+            return
+
+        self.db.execute(
+            insert(model)
+            .values([{"projeto_id": projeto_id, coluna: entidade_id} for projeto_id, entidade_id in sorted(pares)])
+            .on_conflict_do_nothing()
+        )
+
+    def sincronizar_projetos(self, projetos: List[schemas.ProjetoInvestimentoAPI]) -> dict:
+        valores = {p.idUnico: self.projeto_values(p) for p in projetos}
+        campos = [campo for campo in next(iter(valores.values())) if campo != "id_unico"]
+
+        atuais = {
+            row.id_unico: row
+            for row in self.db.execute(
+                select(
+                    models.ProjetoInvestimento.id,
+                    models.ProjetoInvestimento.id_unico,
+                    *[getattr(models.ProjetoInvestimento, campo) for campo in campos]
+                ).where(models.ProjetoInvestimento.id_unico.in_(list(valores)))
+            )
+        }
+
+        agora = datetime.utcnow()
+        projeto_ids = {}
+        novos = []
+        atualizacoes = []
+
+        for id_unico, projeto_valores in valores.items():
+            atual = atuais.get(id_unico)
+
+            if atual is None:
+                novos.append(projeto_valores)
+                continue
+
+            if atual.content_hash == projeto_valores["content_hash"]:
+                continue
+
+            alteracoes = {
+                campo: projeto_valores[campo]
+                for campo in campos
+                if getattr(atual, campo) != projeto_valores[campo]
+            }
+            atualizacoes.append({"id": atual.id, **alteracoes, "updated_at": agora})
+            projeto_ids[id_unico] = atual.id
+
+        # UPDATE em lote por PK; o ORM agrupa linhas consecutivas com o mesmo conjunto de colunas
+        if atualizacoes:
+            atualizacoes.sort(key=lambda linha: (sorted(linha), linha["id"]))
+            self.db.execute(update(models.ProjetoInvestimento), atualizacoes)
+
+        if novos:
+            projeto_ids.update(self.upsert_projetos(novos))
+
+        return projeto_ids
+
+    def process_page(self, projetos: List[schemas.ProjetoInvestimentoAPI]) -> int:
+        projetos_unicos = {projeto_data.idUnico: projeto_data for projeto_data in projetos}
+        if not projetos_unicos:
+            return 0
+
+        projeto_ids = self.sincronizar_projetos([projetos_unicos[id_unico] for id_unico in sorted(projetos_unicos)])
+        if not projeto_ids:
+            return 0
+
+        projetos = [projetos_unicos[id_unico] for id_unico in sorted(projeto_ids)]
+
+        executor_ids = self.upsert_por_codigo(models.Executor, [e for p in projetos for e in p.executores])
+        tomador_ids = self.upsert_por_codigo(models.Tomador, [t for p in projetos for t in p.tomadores])
+        repassador_ids = self.upsert_por_codigo(models.Repassador, [r for p in projetos for r in p.repassadores])
+
+        self.insert_ignorando_existentes(models.Eixo, {
+            e.id: {"id": e.id, "descricao": e.descricao}
+            for p in projetos for e in p.eixos
+        })
+        self.insert_ignorando_existentes(models.Tipo, {
+            t.id: {"id": t.id, "descricao": t.descricao, "eixo_id": t.idEixo}
+            for p in projetos for t in p.tipos
+        })
+        self.insert_ignorando_existentes(models.Subtipo, {
+            sub.id: {"id": sub.id, "descricao": sub.descricao, "tipo_id": sub.idTipo}
+            for p in projetos for sub in p.subTipos
+        })
+
+        ids = sorted(projeto_ids.values())
+
+        for model in ASSOCIACOES:
+            self.db.execute(delete(model).where(model.projeto_id.in_(ids)))
+        self.db.execute(delete(models.FonteRecurso).where(models.FonteRecurso.projeto_id.in_(ids)))
+
+        self.insert_associacoes(models.ProjetoExecutor, "executor_id", {
+            (projeto_ids[p.idUnico], executor_ids[e.codigo]) for p in projetos for e in p.executores
+        })
+        self.insert_associacoes(models.ProjetoTomador, "tomador_id", {
+            (projeto_ids[p.idUnico], tomador_ids[t.codigo]) for p in projetos for t in p.tomadores
+        })
+        self.insert_associacoes(models.ProjetoRepassador, "repassador_id", {
+            (projeto_ids[p.idUnico], repassador_ids[r.codigo]) for p in projetos for r in p.repassadores
+        })
+        self.insert_associacoes(models.ProjetoEixo, "eixo_id", {
+            (projeto_ids[p.idUnico], e.id) for p in projetos for e in p.eixos
+        })
+        self.insert_associacoes(models.ProjetoTipo, "tipo_id", {
+            (projeto_ids[p.idUnico], t.id) for p in projetos for t in p.tipos
+        })
+        self.insert_associacoes(models.ProjetoSubtipo, "subtipo_id", {
+            (projeto_ids[p.idUnico], sub.id) for p in projetos for sub in p.subTipos
+        })
+
+        fontes = [
+            {
+                "projeto_id": projeto_ids[p.idUnico],
+                "origem": fonte_data.origem,
+                "valor_investimento_previsto": fonte_data.valorInvestimentoPrevisto
+            }
+            for p in projetos for fonte_data in p.fontesDeRecurso
+        ]
+        if fontes:
+            self.db.execute(insert(models.FonteRecurso).values(fontes))
+
+        return len(projetos)
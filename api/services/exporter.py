@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+from typing import Iterator, List
+
+from sqlalchemy import select, func, literal_column, Integer, BigInteger, Float, Boolean, Date, DateTime
+
+from api.config import engine, settings
+from api import models
+from api.filters import ProjetoFiltros
+
+FORMATOS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+COLUNAS_PROJETO = [
+    coluna for coluna in models.ProjetoInvestimento.__table__.columns
+    if coluna.name != "content_hash"
+]
+
+COLUNAS_RELACOES = ["executores", "repassadores", "fontes_recurso"]
+
+
+def json_list(campos: dict, select_from, where):
+    pares = []
+    for nome, coluna in campos.items():
+        pares += [literal_column(f"'{nome}'"), coluna]
+
+    return (
+        select(func.coalesce(func.json_agg(func.json_build_object(*pares)), literal_column("'[]'::json")))
+        .select_from(select_from)
+        .where(where)
+        .scalar_subquery()
+    )
+
+
+def export_query(filtros: ProjetoFiltros):
+    projeto = models.ProjetoInvestimento
+
+    executores = json_list(
+        {"nome": models.Executor.nome, "codigo": models.Executor.codigo},
+        select_from=models.ProjetoExecutor.__table__.join(
+            models.Executor.__table__, models.Executor.id == models.ProjetoExecutor.executor_id
+        ),
+        where=models.ProjetoExecutor.projeto_id == projeto.id
+    )
+    repassadores = json_list(
+        {"nome": models.Repassador.nome, "codigo": models.Repassador.codigo},
+        select_from=models.ProjetoRepassador.__table__.join(
+            models.Repassador.__table__, models.Repassador.id == models.ProjetoRepassador.repassador_id
+        ),
+        where=models.ProjetoRepassador.projeto_id == projeto.id
+    )
+    fontes = json_list(
+        {
+            "origem": models.FonteRecurso.origem,
+            "valor_investimento_previsto": models.FonteRecurso.valor_investimento_previsto
+        },
+        select_from=models.FonteRecurso.__table__,
+        where=models.FonteRecurso.projeto_id == projeto.id
+    )
+
+    return (
+        select(
+            *COLUNAS_PROJETO,
+            executores.label("executores"),
+            repassadores.label("repassadores"),
+            fontes.label("fontes_recurso")
+        )
+        .where(*filtros.conditions())
+        .order_by(projeto.id)
+    )
+
+
+def stream_rows(filtros: ProjetoFiltros) -> Iterator[List[dict]]:
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+
+    # cursor no servidor: o Postgres entrega chunk_size linhas por vez, sem ORM
+    with engine.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True, max_row_buffer=chunk_size
+        ).execute(export_query(filtros))
+
+        for partition in result.mappings().partitions(chunk_size):
+            yield [dict(row) for row in partition]
+
+
+def stream_ndjson(filtros: ProjetoFiltros) -> Iterator[bytes]:
+    for rows in stream_rows(filtros):
+        yield "".join(
+            json.dumps(row, default=str, ensure_ascii=False) + "\n" for row in rows
+        ).encode("utf-8")
+
+
+def stream_csv(filtros: ProjetoFiltros) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([coluna.name for coluna in COLUNAS_PROJETO] + COLUNAS_RELACOES)
+
+    for rows in stream_rows(filtros):
+        for row in rows:
+            writer.writerow(
+                [row[coluna.name] for coluna in COLUNAS_PROJETO]
+                + [json.dumps(row[coluna], ensure_ascii=False) for coluna in COLUNAS_RELACOES]
+            )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class StreamSink:
+    # destino "append-only" para o ParquetWriter: guarda bytes ate o proximo drain
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    tipos = [
+        (BigInteger, pa.int64()),
+        (Integer, pa.int64()),
+        (Float, pa.float64()),
+        (Boolean, pa.bool_()),
+        (DateTime, pa.timestamp("us")),
+        (Date, pa.date32()),
+    ]
+
+    def tipo_arrow(coluna):
+        for tipo_sql, tipo_arrow in tipos:
+            if isinstance(coluna.type, tipo_sql):
+                return tipo_arrow
+        return pa.string()
+
+    entidade = pa.list_(pa.struct([("nome", pa.string()), ("codigo", pa.int64())]))
+    fonte = pa.list_(pa.struct([("origem", pa.string()), ("valor_investimento_previsto", pa.float64())]))
+
+    return pa.schema(
+        [(coluna.name, tipo_arrow(coluna)) for coluna in COLUNAS_PROJETO]
+        + [("executores", entidade), ("repassadores", entidade), ("fontes_recurso", fonte)]
+    )
+
+
+def stream_parquet(filtros: ProjetoFiltros) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    sink = StreamSink()
+
+    # cada chunk vira um row group; o footer sai no close
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in stream_rows(filtros):
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+
+    yield sink.drain()
+
+
+def stream_export(formato: str, filtros: ProjetoFiltros) -> Iterator[bytes]:
+    if formato == "csv":
+        return stream_csv(filtros)
+    if formato == "parquet":
+        return stream_parquet(filtros)
+    return stream_ndjson(filtros)
@@ -1,4 +1,6 @@
 import asyncio
+import time
+from collections import deque
 from typing import AsyncIterator
 import httpx
 from fastapi import HTTPException
@@ -7,15 +9,77 @@ from api.config import settings
 from api import schemas
 
 
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
 class ObrasGovClient:
-    def __init__(self):
+    def __init__(self, workers: int = 1):
+        # workers: clientes rodando em paralelo (um por processo no sync multi-UF);
+        # o limite de taxa e de requisicoes em voo e dividido entre eles
+        workers = max(1, workers)
         self.base_url = settings.OBRASGOV_API_BASE_URL
         self.timeout = settings.OBRASGOV_API_TIMEOUT
         self.max_retries = settings.OBRASGOV_API_MAX_RETRIES
         self.backoff_factor = settings.OBRASGOV_RETRY_BACKOFF_FACTOR
-        self.delay = settings.OBRASGOV_DELAY_BETWEEN_REQUESTS
+        self.delay = settings.OBRASGOV_DELAY_BETWEEN_REQUESTS * workers
+        self.max_concurrent = max(1, settings.OBRASGOV_MAX_CONCURRENT_REQUESTS // workers)
+        self.rate_limiter = TokenBucket(
+            rate=1 / self.delay if self.delay > 0 else 0,
+            capacity=self.max_concurrent
+        )
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                http2=settings.OBRASGOV_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=settings.OBRASGOV_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OBRASGOV_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.OBRASGOV_KEEPALIVE_EXPIRY
+                )
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
 
     async def fetch_page(self, uf: str, page: int, page_size: int = 100) -> schemas.APIResponse:
+        return schemas.APIResponse(**await self.fetch_page_raw(uf, page, page_size))
+
+    async def fetch_page_raw(self, uf: str, page: int, page_size: int = 100) -> dict:
         url = f"{self.base_url}/projeto-investimento"
         params = {
             "uf": uf,
@@ -23,45 +87,93 @@ class ObrasGovClient:
             "tamanhoDaPagina": page_size
         }
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            for attempt in range(self.max_retries):
-                try:
-                    response = await client.get(url, params=params)
-                    response.raise_for_status()
+        for attempt in range(self.max_retries):
+            try:
+                await self.rate_limiter.acquire()
+                response = await self.client.get(url, params=params)
+                response.raise_for_status()
 
-                    await asyncio.sleep(self.delay)
+                return response.json()
 
-                    return schemas.APIResponse(**response.json())
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code >= 500 and attempt < self.max_retries - 1:
+                    wait_time = self.backoff_factor ** attempt
+                    await asyncio.sleep(wait_time)
+                    continue
+                raise HTTPException(
+                    status_code=e.response.status_code,
+                    detail=f"Erro ao buscar dados: {str(e)}"
+                )
 
-                except httpx.HTTPStatusError as e:
-                    if e.response.status_code >= 500 and attempt < self.max_retries - 1:
-                        wait_time = self.backoff_factor ** attempt
-                        await asyncio.sleep(wait_time)
-                        continue
-                    raise HTTPException(
-                        status_code=e.response.status_code,
-                        detail=f"Erro ao buscar dados: {str(e)}"
-                    )
+            except httpx.TimeoutException:
+                if attempt < self.max_retries - 1:
+                    continue
+                raise HTTPException(status_code=504, detail="Timeout ao buscar dados da API")
 
-                except httpx.TimeoutException:
-                    if attempt < self.max_retries - 1:
-                        continue
-                    raise HTTPException(status_code=504, detail="Timeout ao buscar dados da API")
+            except httpx.TransportError as e:
+                # conexoes keep-alive podem ser encerradas pelo servidor entre syncs
+                if attempt < self.max_retries - 1:
+                    continue
+                raise HTTPException(status_code=502, detail=f"Erro de conexão: {str(e)}")
 
-                except Exception as e:
-                    raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
     async def fetch_all(self, uf: str, page_size: int = 100) -> AsyncIterator[schemas.APIResponse]:
-        page = 0
+        async for data in self.fetch_all_raw(uf, page_size):
+            yield schemas.APIResponse(**data)
+
+    async def fetch_all_raw(self, uf: str, page_size: int = 100) -> AsyncIterator[dict]:
+        first = await self.fetch_page_raw(uf, 0, page_size)
+
+        if not first.get("content"):
+            return
+
+        yield first
+
+        if first.get("last"):
+            return
+
+        total_pages = first.get("totalPages")
+        if total_pages is None:
+            async for data in self._fetch_sequential(uf, 1, page_size):
+                yield data
+            return
+
+        # janela deslizante: no maximo max_concurrent paginas em voo, entregues em ordem
+        pending = deque()
+        next_page = 1
+        try:
+            while next_page < total_pages or pending:
+                while next_page < total_pages and len(pending) < self.max_concurrent:
+                    pending.append(asyncio.create_task(self.fetch_page_raw(uf, next_page, page_size)))
+                    next_page += 1
+
+                data = await pending.popleft()
+
+                if not data.get("content"):
+                    break
+
+                yield data
+
+                if data.get("last"):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            # recolhe as excecoes das tarefas ja terminadas (evita "Task exception was never retrieved")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _fetch_sequential(self, uf: str, page: int, page_size: int) -> AsyncIterator[dict]:
         while True:
-            response = await self.fetch_page(uf, page, page_size)
+            data = await self.fetch_page_raw(uf, page, page_size)
 
-            if not response.content:
+            if not data.get("content"):
                 break
 
-            yield response
+            yield data
 
-            if response.last:
+            if data.get("last"):
                 break
 
             page += 1
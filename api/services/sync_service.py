@@ -0,0 +1,376 @@
+import asyncio
+import multiprocessing
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from api.aggregates import refresh_aggregates
+from api.cache import data_generation
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from api.config import AsyncSessionLocal, async_engine, engine, settings
+from api import models, schemas
+from api.services.obrasgov_client import ObrasGovClient
+from api.services.data_processor import DataProcessor
+
+MAX_ERRORS_PER_JOB = 100
+
+UFS_BRASIL = [
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO",
+    "MA", "MG", "MS", "MT", "PA", "PB", "PE", "PI", "PR",
+    "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO",
+]
+
+
+def resolve_ufs(uf: str) -> List[str]:
+    uf = uf.upper().replace(" ", "")
+    if uf == "BR":
+        return list(UFS_BRASIL)
+
+    ufs = list(dict.fromkeys(item for item in uf.split(",") if item))
+    invalidas = [item for item in ufs if item not in UFS_BRASIL]
+    if not ufs or invalidas:
+        raise ValueError(f"UF inválida: {', '.join(invalidas) or uf}. Use siglas separadas por vírgula ou BR")
+    return ufs
+
+
+class SyncJob:
+    def __init__(self, uf: str):
+        self.job_id = uuid.uuid4().hex
+        self.uf = uf
+        self.ufs = resolve_ufs(uf)
+        self.ufs_done: List[str] = []
+        self.status = "pending"
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.pages_done = 0
+        self.total_pages: Optional[int] = None
+        self.total_projetos = 0
+        self.projetos_alterados = 0
+        self.errors: List[str] = []
+        self.total_executores: Optional[int] = None
+        self.total_tomadores: Optional[int] = None
+        self.total_repassadores: Optional[int] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if not self.started_at:
+            return 0.0
+        fim = self.finished_at or datetime.utcnow()
+        return (fim - self.started_at).total_seconds()
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return round(self.total_projetos / self.elapsed_seconds, 2)
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        if self.finished:
+            return 0.0
+        if len(self.ufs) > 1:
+            # processos filhos so reportam ao terminar cada UF
+            if not self.ufs_done:
+                return None
+            restantes = len(self.ufs) - len(self.ufs_done)
+            return round(restantes * self.elapsed_seconds / len(self.ufs_done), 1)
+        if not self.total_pages or not self.pages_done:
+            return None
+        restantes = max(self.total_pages - self.pages_done, 0)
+        return round(restantes * self.elapsed_seconds / self.pages_done, 1)
+
+    def add_error(self, error: str):
+        if len(self.errors) < MAX_ERRORS_PER_JOB:
+            self.errors.append(error)
+
+
+class SyncJobRegistry:
+    def __init__(self, max_jobs: int = 50):
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, SyncJob]" = OrderedDict()
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        return self.jobs.get(job_id)
+
+    def running(self, uf: str) -> Optional[SyncJob]:
+        for job in self.jobs.values():
+            if job.uf == uf and not job.finished:
+                return job
+        return None
+
+    def start(self, uf: str, client: ObrasGovClient) -> SyncJob:
+        uf = uf.upper().replace(" ", "")
+        job = self.running(uf)
+        if job:
+            return job
+
+        job = SyncJob(uf)
+        self.jobs[job.job_id] = job
+        while len(self.jobs) > self.max_jobs:
+            self.jobs.popitem(last=False)
+
+        if len(job.ufs) > 1:
+            task = asyncio.create_task(run_multi_sync(job))
+        else:
+            task = asyncio.create_task(run_sync(job, client))
+        self.tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self.tasks.pop(job.job_id, None))
+        return job
+
+    async def cancel_all(self):
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def wait(self, job: SyncJob) -> SyncJob:
+        task = self.tasks.get(job.job_id)
+        if task:
+            await task
+        return job
+
+
+sync_jobs = SyncJobRegistry()
+
+
+async def load_page(content: List[schemas.ProjetoInvestimentoAPI]) -> tuple:
+    # o DataProcessor segue sincrono; run_sync o executa sobre a conexao asyncpg
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(load_page_sync, content)
+
+
+def load_page_sync(db: Session, content: List[schemas.ProjetoInvestimentoAPI]) -> tuple:
+    processor = DataProcessor(db)
+    try:
+        alterados = processor.process_page(content)
+        commit_page(db, alterados)
+        return alterados, []
+    except Exception as e:
+        db.rollback()
+        print(f"Erro na carga em lote, processando projetos individualmente: {str(e)}")
+
+    alterados = 0
+    erros = []
+    for projeto_data in content:
+        try:
+            with db.begin_nested():
+                if processor.process_projeto(projeto_data):
+                    alterados += 1
+        except Exception as e:
+            erros.append(f"{projeto_data.idUnico}: {str(e)}")
+
+    commit_page(db, alterados)
+    return alterados, erros
+
+
+def commit_page(db, alterados: int):
+    # a geracao sobe na mesma transacao da carga; caches so a enxergam apos o commit
+    generation = data_generation.bump(db) if alterados else None
+    db.commit()
+    if generation is not None:
+        data_generation.set(generation)
+
+
+async def refresh_summaries():
+    def refresh(db: Session):
+        refresh_aggregates(db)
+        commit_page(db, 1)
+
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(refresh)
+
+
+async def reload_generation():
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(data_generation.load)
+
+
+async def count_entities() -> dict:
+    async with AsyncSessionLocal() as db:
+        return {
+            campo: await db.scalar(select(func.count()).select_from(model))
+            for campo, model in (
+                ("total_executores", models.Executor),
+                ("total_tomadores", models.Tomador),
+                ("total_repassadores", models.Repassador),
+            )
+        }
+
+
+def first_error(e: BaseException) -> BaseException:
+    while isinstance(e, BaseExceptionGroup) and e.exceptions:
+        e = e.exceptions[0]
+    return e
+
+
+async def run_sync(job: SyncJob, client: ObrasGovClient, summarize: bool = True) -> SyncJob:
+    # pipeline fetch -> validacao -> carga; filas limitadas dao back-pressure entre as etapas
+    parse_workers = max(1, settings.SYNC_PARSE_WORKERS)
+    load_workers = max(1, settings.SYNC_LOAD_WORKERS)
+    raw_pages: asyncio.Queue = asyncio.Queue(maxsize=settings.SYNC_QUEUE_SIZE)
+    pages: asyncio.Queue = asyncio.Queue(maxsize=settings.SYNC_QUEUE_SIZE)
+
+    async def fetch_stage():
+        async for data in client.fetch_all_raw(job.uf):
+            if job.total_pages is None:
+                job.total_pages = data.get("totalPages")
+            await raw_pages.put(data)
+
+        for _ in range(parse_workers):
+            await raw_pages.put(None)
+
+    async def parse_worker():
+        while (data := await raw_pages.get()) is not None:
+            await pages.put(await asyncio.to_thread(schemas.APIResponse.model_validate, data))
+
+    async def parse_stage():
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(parse_workers):
+                tg.create_task(parse_worker())
+
+        for _ in range(load_workers):
+            await pages.put(None)
+
+    async def load_worker():
+        while (page_response := await pages.get()) is not None:
+            alterados, erros = await load_page(page_response.content)
+
+            job.pages_done += 1
+            job.total_projetos += len(page_response.content)
+            job.projetos_alterados += alterados
+            for erro in erros:
+                job.add_error(erro)
+
+    job.status = "running"
+    job.started_at = datetime.utcnow()
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(fetch_stage())
+            tg.create_task(parse_stage())
+            for _ in range(load_workers):
+                tg.create_task(load_worker())
+
+        if summarize:
+            if job.projetos_alterados:
+                await refresh_summaries()
+
+            for campo, valor in (await count_entities()).items():
+                setattr(job, campo, valor)
+
+        job.ufs_done = list(job.ufs)
+        job.status = "completed"
+        print(f"Sync {job.job_id} ({job.uf}) concluído: {job.total_projetos} projetos, {job.projetos_alterados} alterados")
+
+    except asyncio.CancelledError:
+        job.status = "cancelled"
+        raise
+
+    except Exception as e:
+        e = first_error(e)
+        job.status = "failed"
+        job.add_error(str(e))
+        print(f"Erro no sync {job.job_id} ({job.uf}): {str(e)}")
+
+    finally:
+        job.finished_at = datetime.utcnow()
+
+    return job
+
+
+def sync_uf_process(uf: str, workers: int = 1) -> dict:
+    # roda em processo filho (spawn): cliente HTTP, engine e event loop proprios;
+    # cada um dos workers processos recebe 1/workers do limite de taxa da API
+    async def main() -> SyncJob:
+        try:
+            async with ObrasGovClient(workers=workers) as client:
+                return await run_sync(SyncJob(uf), client, summarize=False)
+        finally:
+            await async_engine.dispose()
+
+    try:
+        job = asyncio.run(main())
+    finally:
+        engine.dispose()
+
+    return {
+        "uf": uf,
+        "status": job.status,
+        "pages_done": job.pages_done,
+        "total_projetos": job.total_projetos,
+        "projetos_alterados": job.projetos_alterados,
+        "errors": job.errors,
+    }
+
+
+async def run_multi_sync(job: SyncJob) -> SyncJob:
+    # uma UF por processo; entidades compartilhadas usam ON CONFLICT com chaves ordenadas
+    loop = asyncio.get_running_loop()
+    workers = max(1, min(settings.SYNC_PROCESSES, len(job.ufs)))
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def sync_uf(uf: str) -> dict:
+        try:
+            return await loop.run_in_executor(pool, sync_uf_process, uf, workers)
+        except Exception as e:
+            return {"uf": uf, "status": "failed", "errors": [str(e)]}
+
+    job.status = "running"
+    job.started_at = datetime.utcnow()
+    falhas = []
+
+    try:
+        for future in asyncio.as_completed([sync_uf(uf) for uf in job.ufs]):
+            resultado = await future
+            uf = resultado["uf"]
+
+            job.ufs_done.append(uf)
+            job.pages_done += resultado.get("pages_done", 0)
+            job.total_projetos += resultado.get("total_projetos", 0)
+            job.projetos_alterados += resultado.get("projetos_alterados", 0)
+            for erro in resultado["errors"]:
+                job.add_error(f"{uf}: {erro}")
+            if resultado["status"] != "completed":
+                falhas.append(uf)
+
+            # os filhos sobem a geracao no banco; o cache deste processo passa a enxerga-la
+            await reload_generation()
+
+        job.total_pages = job.pages_done
+
+        if job.projetos_alterados:
+            await refresh_summaries()
+
+        for campo, valor in (await count_entities()).items():
+            setattr(job, campo, valor)
+
+        job.status = "failed" if len(falhas) == len(job.ufs) else "completed"
+        print(
+            f"Sync {job.job_id} ({len(job.ufs)} UFs) concluído: {job.total_projetos} projetos, "
+            f"{job.projetos_alterados} alterados, falhas: {', '.join(falhas) or 'nenhuma'}"
+        )
+
+    except asyncio.CancelledError:
+        job.status = "cancelled"
+        raise
+
+    except Exception as e:
+        job.status = "failed"
+        job.add_error(str(e))
+        print(f"Erro no sync {job.job_id} ({job.uf}): {str(e)}")
+
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        job.finished_at = datetime.utcnow()
+
+    return job
@@ -6,6 +6,8 @@ import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from analysis import DataLoader, Normalizador, Analisador, Visualizador
+from analysis.data_loader import COLUNAS_RESUMO
+from api.config import settings
 
 st.set_page_config(
     page_title="Dashboard ObrasGov DF",
@@ -18,35 +20,107 @@ st.sidebar.markdown("---")
 
 st.title("Dashboard ObrasGov - Distrito Federal")
 
-@st.cache_data
-def load_all_data():
-    loader = DataLoader()
-    df = loader.load_projetos()
-    df = Normalizador.normalizar_completo(df)
-    return df
+# teto de seguranca; na pratica a troca de geracao (novo sync) invalida antes
+CACHE_TTL_SECONDS = 6 * 3600
 
-@st.cache_data
-def load_executores_data(n):
-    loader = DataLoader()
-    return loader.load_top_executores(n=n)
+MESES = {
+    1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril',
+    5: 'Maio', 6: 'Junho', 7: 'Julho', 8: 'Agosto',
+    9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
+}
 
-@st.cache_data
-def load_repassadores_data():
-    loader = DataLoader()
-    return loader.load_valores_por_repassador()
 
-@st.cache_data
-def load_temporal_data():
-    loader = DataLoader()
-    return loader.load_projetos_por_ano()
+@st.cache_resource
+def get_loader():
+    # um DataLoader (engine + pool) por processo do Streamlit, compartilhado entre sessoes
+    return DataLoader()
+
+
+@st.cache_data(ttl=settings.SNAPSHOT_GENERATION_TTL_SECONDS, show_spinner=False)
+def current_generation():
+    # geracao do ultimo sync: todas as funcoes abaixo usam como chave em vez de hashear DataFrames
+    return get_loader().generation()
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=2, show_spinner=False)
+def load_all_data(generation):
+    # cache_resource: o mesmo DataFrame em todos os reruns, sem copia/pickle; tratado como somente leitura
+    df = get_loader().load_projetos(columns=COLUNAS_RESUMO, backend="arrow")
+    return Normalizador.normalizar_completo(df, inplace=True)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=2, show_spinner=False)
+def load_diagnostico(generation):
+    return Normalizador.diagnosticar_problemas(load_all_data(generation))
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=2, show_spinner=False)
+def load_analise(generation):
+    return Analisador.analise_completa(load_all_data(generation))
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=2, show_spinner=False)
+def load_situacao(generation):
+    return Analisador.analise_situacao(load_all_data(generation))
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=2, show_spinner=False)
+def load_anos(generation):
+    df = load_all_data(generation)
+    if 'ano_cadastro' not in df.columns:
+        return []
+    return sorted(df['ano_cadastro'].dropna().unique().tolist())
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=64, show_spinner=False)
+def load_periodo(generation, ano_inicio, ano_fim):
+    df = load_all_data(generation)
+    df_filtrado = df[(df['ano_cadastro'] >= ano_inicio) & (df['ano_cadastro'] <= ano_fim)]
+
+    resumo = {'total': len(df_filtrado)}
+    if 'situacao' in df_filtrado.columns:
+        contagem = df_filtrado['situacao'].value_counts()
+        resumo['cadastrados'] = int(contagem.get('Cadastrada', 0))
+        resumo['concluidos'] = int(contagem.get('Concluída', 0))
+    return resumo
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=2, show_spinner=False)
+def load_meses(generation):
+    df = load_all_data(generation)
+    if 'mes_cadastro' not in df.columns:
+        return None
+
+    df_mes = df.groupby('mes_cadastro').size().reset_index(name='total_projetos')
+    df_mes = df_mes.sort_values('mes_cadastro')
+    df_mes['mes_nome'] = df_mes['mes_cadastro'].map(MESES)
+    return df_mes
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=32, show_spinner=False)
+def load_executores_data(generation, n):
+    return get_loader().load_top_executores(n=n)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=2, show_spinner=False)
+def load_repassadores_data(generation):
+    return get_loader().load_valores_por_repassador()
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=2, show_spinner=False)
+def load_temporal_data(generation):
+    return get_loader().load_projetos_por_ano()
+
+
+generation = current_generation()
 
 st.markdown(f'<div id="visao_geral"></div>', unsafe_allow_html=True)
 st.header("Visão Geral")
 
 with st.spinner("Carregando dados..."):
-    df = load_all_data()
-    diagnostico = Normalizador.diagnosticar_problemas(df)
-    analise = Analisador.analise_completa(df)
+    df = load_all_data(generation)
+    diagnostico = load_diagnostico(generation)
+    analise = load_analise(generation)
 
 st.subheader("Resumo do Dataset")
 
@@ -82,7 +156,7 @@ else:
 
 st.subheader("Distribuição por Situação")
 
-situacao_df = Analisador.analise_situacao(df)
+situacao_df = load_situacao(generation)
 if not situacao_df.empty:
     col1, col2 = st.columns([2, 1])
 
@@ -103,7 +177,7 @@ st.markdown("Executores são as instituições responsáveis pela execução dos
 n_executores = st.slider("Número de executores para exibir", min_value=5, max_value=31, value=10, step=1)
 
 with st.spinner("Carregando dados de executores..."):
-    df_top_executores = load_executores_data(n_executores)
+    df_top_executores = load_executores_data(generation, n_executores)
 
 col1, col2 = st.columns([3, 1])
 
@@ -152,7 +226,7 @@ st.header("Repassadores")
 st.markdown("Repassadores são os órgãos responsáveis por repassar recursos para os projetos.")
 
 with st.spinner("Carregando dados de repassadores..."):
-    df_repassadores = load_repassadores_data()
+    df_repassadores = load_repassadores_data(generation)
 
 n_repassadores = st.slider("Número de repassadores para exibir", min_value=5, max_value=25, value=10, step=1)
 
@@ -216,7 +290,7 @@ st.header("Análise Temporal")
 st.markdown("Esta seção apresenta a evolução dos projetos ao longo do tempo.")
 
 with st.spinner("Carregando dados temporais..."):
-    df_ano = load_temporal_data()
+    df_ano = load_temporal_data(generation)
 
 st.subheader("Evolução de Cadastros por Ano")
 
@@ -240,50 +314,38 @@ if not df_ano.empty:
 else:
     st.warning("Não há dados temporais disponíveis")
 
-if 'ano_cadastro' in df.columns:
-    anos_disponiveis = sorted(df['ano_cadastro'].dropna().unique())
-
-    if len(anos_disponiveis) > 0:
-        st.subheader("Análise por Período")
+anos_disponiveis = load_anos(generation)
 
-        col1, col2 = st.columns(2)
+if anos_disponiveis:
+    st.subheader("Análise por Período")
 
-        with col1:
-            ano_inicio = st.selectbox("Ano Início", anos_disponiveis, index=0)
-
-        with col2:
-            ano_fim = st.selectbox("Ano Fim", anos_disponiveis, index=len(anos_disponiveis)-1)
+    col1, col2 = st.columns(2)
 
-        df_filtrado = df[(df['ano_cadastro'] >= ano_inicio) & (df['ano_cadastro'] <= ano_fim)]
+    with col1:
+        ano_inicio = st.selectbox("Ano Início", anos_disponiveis, index=0)
 
-        col1, col2, col3 = st.columns(3)
+    with col2:
+        ano_fim = st.selectbox("Ano Fim", anos_disponiveis, index=len(anos_disponiveis)-1)
 
-        with col1:
-            st.metric("Total de Projetos", len(df_filtrado))
+    periodo = load_periodo(generation, ano_inicio, ano_fim)
 
-        with col2:
-            if 'situacao' in df_filtrado.columns:
-                cadastrados = len(df_filtrado[df_filtrado['situacao'] == 'Cadastrada'])
-                st.metric("Cadastrados", cadastrados)
+    col1, col2, col3 = st.columns(3)
 
-        with col3:
-            if 'situacao' in df_filtrado.columns:
-                concluidos = len(df_filtrado[df_filtrado['situacao'] == 'Concluída'])
-                st.metric("Concluídos", concluidos)
+    with col1:
+        st.metric("Total de Projetos", periodo['total'])
 
-if 'mes_cadastro' in df.columns:
-    st.subheader("Análise de Meses")
+    with col2:
+        if 'cadastrados' in periodo:
+            st.metric("Cadastrados", periodo['cadastrados'])
 
-    df_mes = df.groupby('mes_cadastro').size().reset_index(name='total_projetos')
-    df_mes = df_mes.sort_values('mes_cadastro')
+    with col3:
+        if 'concluidos' in periodo:
+            st.metric("Concluídos", periodo['concluidos'])
 
-    meses_map = {
-        1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril',
-        5: 'Maio', 6: 'Junho', 7: 'Julho', 8: 'Agosto',
-        9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
-    }
+df_mes = load_meses(generation)
 
-    df_mes['mes_nome'] = df_mes['mes_cadastro'].map(meses_map)
+if df_mes is not None:
+    st.subheader("Análise de Meses")
 
     col1, col2 = st.columns([3, 1])
 
@@ -344,7 +406,7 @@ with tab1:
         - FastAPI + Uvicorn
         - Porta: 8000:8000
         - Healthcheck: /ready endpoint
-        - Sync inicial automático
+        - Sync inicial automático (background)
         """)
 
     with col2:
@@ -376,7 +438,7 @@ with tab1:
     ```
     **Healthchecks garantem ordem de inicialização:**
     1. Postgres sobe e passa healthcheck (pg_isready)
-    2. API inicia, executa sync e passa healthcheck (/ready)
+    2. API inicia, dispara sync em background e passa healthcheck (/ready)
     3. Streamlit e Jupyter só sobem após API estar pronta
     ```
     """)
@@ -405,7 +467,7 @@ with tab2:
         **TRANSFORM**
         - DataProcessor
         - Parse de datas
-        - Get or Create entidades
+        - Upsert em lote das entidades
         - Deduplicação por código/id
         - Pydantic validation
         """)
@@ -413,11 +475,11 @@ with tab2:
     with col3:
         st.markdown("""
         **LOAD**
-        - SQLAlchemy ORM
-        - Check duplicata por id_unico
-        - INSERT ou UPDATE
-        - Clear + Append N:N
-        - Flush + Commit por página
+        - SQLAlchemy Core (PostgreSQL)
+        - INSERT ... ON CONFLICT por id_unico
+        - INSERT multi-linha por tabela
+        - Delete + insert em lote N:N
+        - Commit por página
         """)
 
     st.markdown("---")
@@ -433,7 +495,8 @@ class ObrasGovClient:
 
 # api/services/data_processor.py
 class DataProcessor:
-    - process_projeto(data) → INSERT/UPDATE
+    - process_page(content) → upsert em lote da página
+    - process_projeto(data) → INSERT/UPDATE (fallback)
     - Extrai e cria entidades relacionadas
     - Gerencia transações
     """, language="python")
@@ -576,14 +639,18 @@ services:
     st.subheader("Endpoints da API")
 
     endpoints_df = pd.DataFrame({
-        'Endpoint': ['/health', '/ready', '/sync', '/projetos', '/projetos/{id}'],
-        'Método': ['GET', 'GET', 'POST', 'GET', 'GET'],
+        'Endpoint': ['/health', '/ready', '/sync', '/sync/{job_id}', '/projetos', '/projetos/export', '/projetos/{id}', '/projetos/batch', '/stats/*'],
+        'Método': ['GET', 'GET', 'POST', 'GET', 'GET', 'GET', 'GET', 'POST', 'GET'],
         'Descrição': [
             'Status da API e banco',
             'Readiness check (banco populado)',
-            'Sincronização manual (uf=DF)',
-            'Lista projetos (paginação)',
-            'Busca projeto específico'
+            'Inicia sincronização em background (uf=DF)',
+            'Progresso do job de sincronização',
+            'Lista projetos (paginação por cursor e filtros)',
+            'Exportação em NDJSON/CSV/Parquet (streaming)',
+            'Busca projeto específico (com relações)',
+            'Busca vários projetos por id_unico',
+            'Agregados (situação, top executores/tomadores, repassadores, por ano)'
         ]
     })
 
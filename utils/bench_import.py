@@ -0,0 +1,83 @@
+"""Mede o tempo de import do pacote analysis em processos novos (cold start).
+
+Falha (exit 1) se algum import carregar plotly/matplotlib/seaborn ou passar do orcamento.
+
+    python utils/bench_import.py
+    python utils/bench_import.py --budget 1.5 --repeat 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS_PESADOS = ["plotly", "matplotlib", "seaborn"]
+
+CASOS = {
+    "import analysis": "import analysis",
+    "DataLoader": "from analysis import DataLoader",
+    "Normalizador": "from analysis import Normalizador",
+    "Analisador": "from analysis import Analisador",
+    "Visualizador": "from analysis import Visualizador",
+}
+
+SCRIPT = """
+import json, sys, time
+inicio = time.perf_counter()
+{stmt}
+duracao = time.perf_counter() - inicio
+print(json.dumps([duracao, [m for m in {pesados!r} if m in sys.modules]]))
+"""
+
+
+def medir(stmt: str, repeticoes: int) -> tuple:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [RAIZ, os.environ.get("PYTHONPATH")]))}
+    codigo = SCRIPT.format(stmt=stmt, pesados=MODULOS_PESADOS)
+
+    duracoes = []
+    pesados = set()
+    for _ in range(repeticoes):
+        resultado = subprocess.run(
+            [sys.executable, "-c", codigo],
+            cwd=RAIZ, env=env, capture_output=True, text=True, check=True
+        )
+        duracao, carregados = json.loads(resultado.stdout.strip().splitlines()[-1])
+        duracoes.append(duracao)
+        pesados.update(carregados)
+
+    return statistics.median(duracoes), sorted(pesados)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=2.0, help="tempo maximo (mediana, em segundos) por import")
+    parser.add_argument("--repeat", type=int, default=5, help="processos medidos por caso")
+    args = parser.parse_args()
+
+    falhas = []
+    print(f"{'caso':<18} {'mediana (s)':>12}  modulos pesados")
+    for nome, stmt in CASOS.items():
+        try:
+            mediana, pesados = medir(stmt, args.repeat)
+        except subprocess.CalledProcessError as e:
+            print(f"{nome:<18} {'erro':>12}  {e.stderr.strip().splitlines()[-1] if e.stderr else ''}")
+            falhas.append(nome)
+            continue
+
+        print(f"{nome:<18} {mediana:>12.3f}  {', '.join(pesados) or '-'}")
+        if pesados or mediana > args.budget:
+            falhas.append(nome)
+
+    if falhas:
+        print(f"\nRegressão no tempo de import: {', '.join(falhas)} (orçamento {args.budget}s, sem {', '.join(MODULOS_PESADOS)})")
+        return 1
+
+    print("\nOK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -76,8 +76,8 @@ echo "[6/6] Aguardando inicialização completa..."
 echo "  Aguardando PostgreSQL..."
 sleep 5
 
-echo "  Aguardando API e sync inicial de dados..."
-echo "  (Pode levar até 5 minutos na primeira execução)"
+echo "  Aguardando API e primeiros dados do sync inicial..."
+echo "  (O sync completo continua em background)"
 
 MAX_WAIT=300
 ELAPSED=0
@@ -86,8 +86,8 @@ while [ $ELAPSED -lt $MAX_WAIT ]; do
         echo "  API pronta!"
         break
     fi
-    sleep 10
-    ELAPSED=$((ELAPSED + 10))
+    sleep 2
+    ELAPSED=$((ELAPSED + 2))
     echo "  Aguardando... (${ELAPSED}s/${MAX_WAIT}s)"
 done
 